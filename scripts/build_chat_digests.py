@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+チャット用 図番ダイジェスト（要約）キャッシュ作成スクリプト
+
+チャットのコンテキスト作成に必要な情報（タイトル、機械種別、材質、主な切削条件、
+注意事項、トラブル対応の上位数件）だけを図番ごとに抜き出し、データルートの
+chat-digests.json にまとめて保存する。1件あたりの大きさは上限付き。
+
+各エントリは図番 + ソースハッシュ（instruction.json と contributions.json の
+内容の SHA-256）で管理し、再実行時はハッシュが変わった図番だけ作り直す。
+読み込み側（src/lib/drawingDigest.ts）は両ファイルの更新時刻・サイズを
+記録値と比べ、変わっていればダイジェストを使わず元ファイルを読む。
+
+使い方:
+    python scripts/build_chat_digests.py
+    python scripts/build_chat_digests.py --data-root ./public/data_demo
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from drawing_paths import DrawingResolver, get_data_root
+from instruction_data import iter_cutting_conditions, iter_work_steps
+
+CACHE_NAME = 'chat-digests.json'
+DIGEST_VERSION = 1
+
+# ダイジェストの大きさの上限
+MAX_TEXT = 120
+MAX_WARNINGS = 5
+MAX_CONDITIONS = 5
+MAX_TROUBLESHOOTING = 3
+MAX_TOOLS = 10
+
+MATERIAL_PATTERN = re.compile(
+    r'SUS\d{3}[A-Z]?|S\d{2}C|SS\d{3}|SCM\d{3}|SPH[CD]?|SPCC|A\d{4}|C\d{4}|FC\d{3}'
+    r'|ステンレス|アルミ|ジュラルミン|真鍮|黄銅|銅|炭素鋼|鋳鉄',
+    re.IGNORECASE,
+)
+
+
+def truncate(text):
+    text = str(text or '').strip()
+    return text if len(text) <= MAX_TEXT else text[:MAX_TEXT - 1] + '…'
+
+
+def file_signature(path):
+    """読み込み側が比較する更新時刻（ナノ秒、文字列）とサイズ"""
+    if not path.exists():
+        return None
+    stat = path.stat()
+    return {'mtimeNs': str(stat.st_mtime_ns), 'size': stat.st_size}
+
+
+def format_condition(condition):
+    parts = [condition.get(key, '') for key in ('tool', 'spindleSpeed', 'feedRate', 'depthOfCut')]
+    return ' '.join(str(p) for p in parts if p)
+
+
+def build_digest(instruction, contributions):
+    metadata = instruction.get('metadata') or {}
+    overview = instruction.get('overview') or {}
+    steps = [step for _, step in iter_work_steps(instruction)]
+
+    conditions = []
+    for step in steps:
+        for condition in iter_cutting_conditions(step):
+            text = truncate(format_condition(condition))
+            if text and text not in conditions:
+                conditions.append(text)
+
+    warnings = list(overview.get('warnings') or [])
+    warnings += [
+        f"{step.get('title', '')}: {step.get('description', '')}"
+        for step in steps if step.get('warningLevel') in ('important', 'critical')
+    ]
+
+    troubleshooting = [
+        {'problem': truncate(item.get('problem')), 'solution': truncate(item.get('solution'))}
+        for item in instruction.get('troubleshooting') or []
+    ]
+    # 現場の追記もトラブル対応の知見として扱う
+    for contribution in contributions:
+        text = (contribution.get('content') or {}).get('text', '')
+        if contribution.get('status', 'active') == 'active' and text:
+            troubleshooting.append({'problem': '現場追記', 'solution': truncate(text)})
+
+    material_source = ' '.join([metadata.get('title', ''), overview.get('description', '')])
+    materials = sorted({m.upper() for m in MATERIAL_PATTERN.findall(material_source)})
+
+    return {
+        'drawingNumber': metadata.get('drawingNumber', ''),
+        'title': truncate(metadata.get('title')),
+        'companyId': metadata.get('companyId', ''),
+        'machineTypes': list(metadata.get('machineType') or []),
+        'difficulty': metadata.get('difficulty', ''),
+        'estimatedTime': metadata.get('estimatedTime', ''),
+        'toolsRequired': [truncate(t) for t in (metadata.get('toolsRequired') or [])[:MAX_TOOLS]],
+        'materials': materials,
+        'stepCount': len(steps),
+        'cuttingConditions': conditions[:MAX_CONDITIONS],
+        'warnings': [truncate(w) for w in warnings[:MAX_WARNINGS]],
+        'troubleshooting': troubleshooting[:MAX_TROUBLESHOOTING],
+    }
+
+
+def load_cache(cache_path):
+    if not cache_path.exists():
+        return {}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('version') != DIGEST_VERSION:
+        return {}
+    return cache.get('digests', {})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='チャット用図番ダイジェストの作成')
+    parser.add_argument('--data-root', type=Path, default=Path(get_data_root()))
+    args = parser.parse_args()
+
+    cache_path = args.data_root / CACHE_NAME
+    cached = load_cache(cache_path)
+
+    print("📝 チャット用ダイジェストを作成中...")
+    started = time.monotonic()
+
+    digests = {}
+    rebuilt = 0
+    for relative, instruction_file in DrawingResolver(args.data_root).iter_instruction_files():
+        folder = instruction_file.parent
+        contributions_file = folder / 'contributions' / 'contributions.json'
+
+        instruction_raw = instruction_file.read_bytes()
+        contributions_raw = contributions_file.read_bytes() if contributions_file.exists() else b''
+        source_hash = hashlib.sha256(instruction_raw + b'\0' + contributions_raw).hexdigest()
+
+        signatures = {
+            'instruction': file_signature(instruction_file),
+            'contributions': file_signature(contributions_file),
+        }
+
+        previous = cached.get(relative)
+        if previous and previous['sourceHash'] == source_hash:
+            # 内容が同じなら更新時刻だけ取り直す（touch されただけの場合）
+            digests[relative] = {**previous, 'sources': signatures}
+            continue
+
+        instruction = json.loads(instruction_raw)
+        contributions = json.loads(contributions_raw).get('contributions', []) if contributions_raw else []
+        digests[relative] = {
+            'sourceHash': source_hash,
+            'sources': signatures,
+            'digest': build_digest(instruction, contributions),
+        }
+        rebuilt += 1
+
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': DIGEST_VERSION,
+            'generatedAt': datetime.now(timezone.utc).isoformat(),
+            'digests': digests,
+        }, f, ensure_ascii=False, separators=(',', ':'))
+
+    size = cache_path.stat().st_size
+    print(f"  📊 図番数: {len(digests)}（再作成 {rebuilt}件）")
+    print(f"  💾 {cache_path}（{size:,} bytes, 平均 {size // max(len(digests), 1):,} bytes/図番, "
+          f"{time.monotonic() - started:.2f}秒）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+検索インデックスの会社別シャード・圧縮済みファイル作成スクリプト
+
+search-index.json を会社IDごとのシャードに分け、会社一覧と各シャードの
+ETag・件数だけを持つ小さなマニフェストと一緒に search-index-shards/ へ
+出力する。各ファイルは gzip 版（brotli モジュールがあれば .br 版も）を
+あらかじめ作成しておき、/api/search-index はリクエストの Accept-Encoding に
+合わせてそのまま返す。ETag は内容の SHA-256 から作る。
+
+内容が変わらないシャードは書き直さない。マニフェストには元の
+search-index.json の更新時刻・サイズを記録し、管理画面の更新などで
+元ファイルが変わった場合、API は再作成されるまでシャードを使わない。
+
+使い方:
+    python scripts/build_search_index_shards.py
+    python scripts/build_search_index_shards.py --data-root ./public/data_demo
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from drawing_paths import get_data_root
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+OUTPUT_DIR = 'search-index-shards'
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+UNASSIGNED_COMPANY = 'unknown'
+
+
+def dump_compact(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def shard_file_name(company_id):
+    safe = re.sub(r'[^A-Za-z0-9_-]', '_', company_id)
+    if safe != company_id:
+        # 記号を置き換えた場合は衝突しないよう元のIDのハッシュを付ける
+        safe += '-' + hashlib.sha1(company_id.encode('utf-8')).hexdigest()[:8]
+    return f"company-{safe}.json"
+
+
+def write_variants(output_dir, name, raw):
+    """元ファイルと圧縮版を書き出し、{エンコーディング: バイト数} を返す"""
+    variants = {'identity': raw, 'gzip': gzip.compress(raw, compresslevel=9, mtime=0)}
+    if brotli:
+        variants['br'] = brotli.compress(raw, quality=11)
+
+    suffixes = {'identity': '', 'gzip': '.gz', 'br': '.br'}
+    for encoding, body in variants.items():
+        path = output_dir / f"{name}{suffixes[encoding]}"
+        temp_path = path.with_name(f"{path.name}.tmp")
+        temp_path.write_bytes(body)
+        os.replace(temp_path, path)
+    # brotli が無い環境で作り直した場合に古い .br が残らないようにする
+    if not brotli and (output_dir / f"{name}.br").exists():
+        (output_dir / f"{name}.br").unlink()
+    return {encoding: len(body) for encoding, body in variants.items()}
+
+
+def load_previous(output_dir):
+    manifest_path = output_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        return {}
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('companies', {})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='検索インデックスの会社別シャード作成')
+    parser.add_argument('--data-root', type=Path, default=Path(get_data_root()))
+    args = parser.parse_args()
+
+    index_path = args.data_root / 'search-index.json'
+    if not index_path.exists():
+        print(f"❌ ファイルが見つかりません: {index_path}")
+        sys.exit(1)
+
+    print("📦 検索インデックスのシャードを作成中...")
+    started = time.monotonic()
+
+    source_stat = index_path.stat()
+    with open(index_path, 'r', encoding='utf-8') as f:
+        search_index = json.load(f)
+
+    output_dir = args.data_root / OUTPUT_DIR
+    output_dir.mkdir(exist_ok=True)
+    previous = load_previous(output_dir)
+
+    by_company = defaultdict(list)
+    for drawing in search_index.get('drawings', []):
+        by_company[drawing.get('companyId') or UNASSIGNED_COMPANY].append(drawing)
+
+    encodings = ['gzip', 'br'] if brotli else ['gzip']
+    companies = {}
+    written = 0
+    for company_id, drawings in sorted(by_company.items()):
+        raw = dump_compact({'companyId': company_id, 'drawings': drawings})
+        etag = hashlib.sha256(raw).hexdigest()[:32]
+        name = shard_file_name(company_id)
+
+        entry = previous.get(company_id)
+        unchanged = (
+            entry and entry['etag'] == etag and entry.get('encodings') == encodings
+            and (output_dir / name).exists()
+        )
+        sizes = entry['bytes'] if unchanged else write_variants(output_dir, name, raw)
+        written += not unchanged
+
+        first = drawings[0]
+        companies[company_id] = {
+            'file': name,
+            'etag': etag,
+            'encodings': encodings,
+            'companyName': first.get('companyName', ''),
+            'drawingCount': len(drawings),
+            'bytes': sizes,
+        }
+
+    # 削除された会社のシャードを片付ける
+    live_files = {entry['file'] for entry in companies.values()}
+    for path in output_dir.glob('company-*'):
+        if path.name.split('.json')[0] + '.json' not in live_files:
+            path.unlink()
+
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'source': {'mtimeNs': str(source_stat.st_mtime_ns), 'size': source_stat.st_size},
+        'metadata': search_index.get('metadata', {}),
+        'totalDrawings': sum(entry['drawingCount'] for entry in companies.values()),
+        'encodings': encodings,
+        'companies': companies,
+    }
+    manifest_sizes = write_variants(output_dir, MANIFEST_NAME, dump_compact(manifest))
+
+    elapsed = time.monotonic() - started
+    total = {encoding: sum(e['bytes'].get(encoding, 0) for e in companies.values())
+             for encoding in ['identity'] + encodings}
+    print(f"  📊 会社数: {len(companies)}（再作成 {written}件） / 図番数: {manifest['totalDrawings']}")
+    print(f"  📉 元: {index_path.stat().st_size:,} bytes → シャード合計 "
+          + ' / '.join(f"{encoding} {size:,}" for encoding, size in total.items()) + " bytes")
+    print(f"  🗂️ マニフェスト: {manifest_sizes['identity']:,} bytes (gzip {manifest_sizes['gzip']:,})")
+    if not brotli:
+        print("  ⚠️ brotli モジュールが無いため .br 版は作成していません（pip install brotli）")
+    print(f"💾 {output_dir}（{elapsed:.2f}秒）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+チャット検索用 TF-IDF インデックス作成スクリプト
+
+図番ごとに instruction.json・search-index.json・追記（contributions.json）の
+テキストを集め、TF-IDF 行列（図番 × 語）を NumPy/SciPy の疎行列演算で作成する。
+行列は語ごとの転置インデックス（CSC 形式）としてバイナリで保存し、
+src/lib/tfidfIndex.ts から直接読み込めるようにする。
+
+出力（データルート/search-tfidf/）:
+    meta.json     図番リスト・語彙（語 → 列番号）・作成日時
+    idf.f32       語ごとの IDF（float32）
+    indptr.i32    CSC の列ポインタ（int32）
+    indices.i32   行（図番）番号（int32）
+    data.f32      L2 正規化済みの TF-IDF 値（float32）
+
+トークン化は src/lib/tfidfIndex.ts の tokenize と同じ規則で行うこと。
+
+使い方:
+    python scripts/build_tfidf_index.py
+    python scripts/build_tfidf_index.py --query "SUS304 外径 仕上げ" --top 5
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+import unicodedata
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+
+from drawing_paths import DrawingResolver, get_data_root
+from instruction_data import iter_cutting_conditions, iter_work_steps
+
+INDEX_DIR = 'search-tfidf'
+FORMAT_VERSION = 1
+
+MACHINE_TYPE_LABELS = {
+    'machining': 'マシニング',
+    'turning': 'ターニング',
+    'yokonaka': '横中',
+    'radial': 'ラジアル',
+    'other': 'その他',
+}
+
+# 英数字の語、またはかな・カナ・漢字の連続（連続部分は文字 bigram に分解）
+TOKEN_PATTERN = re.compile(r'[a-z0-9][a-z0-9_\-]*|[\u3040-\u30ff\u3400-\u9fff]+')
+ASCII_START = re.compile(r'[a-z0-9]')
+# ひらがなだけの語は助詞・助動詞・活用語尾（です・ます・どう 等）なので索引に入れない
+HIRAGANA_ONLY = re.compile(r'[\u3040-\u309f]+')
+
+# タイトル・キーワードは本文より重く扱う
+FIELD_WEIGHTS = {'title': 3, 'keywords': 2, 'body': 1}
+
+
+def tokenize(text):
+    """NFKC 正規化・小文字化した上で語と文字 bigram に分割（ひらがなだけの語は除く）"""
+    text = unicodedata.normalize('NFKC', str(text)).lower()
+    tokens = []
+    for run in TOKEN_PATTERN.findall(text):
+        if ASCII_START.match(run) or len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return [t for t in tokens if not HIRAGANA_ONLY.fullmatch(t)]
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def collect_fields(instruction, index_entry, contributions):
+    """図番1件分のテキストを重み区分ごとに集める"""
+    metadata = instruction.get('metadata') or {}
+    overview = instruction.get('overview') or {}
+    fields = {'title': [], 'keywords': [], 'body': []}
+
+    fields['title'] += [metadata.get('drawingNumber', ''), metadata.get('title', '')]
+    fields['keywords'] += index_entry.get('keywords', [])
+    fields['keywords'] += [
+        index_entry.get('companyName', ''),
+        index_entry.get('productName', ''),
+        index_entry.get('category', ''),
+        metadata.get('difficulty', ''),
+    ]
+    for machine_type in metadata.get('machineType') or []:
+        fields['keywords'] += [machine_type, MACHINE_TYPE_LABELS.get(machine_type, '')]
+    fields['keywords'] += metadata.get('toolsRequired') or []
+
+    body = fields['body']
+    body.append(overview.get('description', ''))
+    body += overview.get('warnings') or []
+
+    for _, step in iter_work_steps(instruction):
+        body += [step.get('title', ''), step.get('description', '')]
+        body += step.get('detailedInstructions') or []
+        body += step.get('tools') or []
+        body += step.get('notes') or []
+        for condition in iter_cutting_conditions(step):
+            body += [str(v) for v in condition.values()]
+
+    for item in instruction.get('troubleshooting') or []:
+        body += [item.get('problem', ''), item.get('cause', ''), item.get('solution', '')]
+    for item in instruction.get('nearMiss') or []:
+        body += [item.get('title', ''), item.get('description', ''), item.get('prevention', '')]
+
+    for contribution in contributions:
+        if contribution.get('status', 'active') == 'active':
+            body.append((contribution.get('content') or {}).get('text', ''))
+
+    return fields
+
+
+def build_index(data_root):
+    index_path = data_root / 'search-index.json'
+    index_entries = {}
+    if index_path.exists():
+        index_entries = {d['drawingNumber']: d for d in load_json(index_path).get('drawings', [])}
+
+    docs = []
+    term_counts = []
+    for relative, instruction_file in DrawingResolver(data_root).iter_instruction_files():
+        instruction = load_json(instruction_file)
+        drawing = (instruction.get('metadata') or {}).get('drawingNumber') \
+            or instruction_file.parent.name.replace('drawing-', '', 1)
+
+        contributions_file = instruction_file.parent / 'contributions' / 'contributions.json'
+        contributions = []
+        if contributions_file.exists():
+            contributions = load_json(contributions_file).get('contributions', [])
+
+        fields = collect_fields(instruction, index_entries.get(drawing, {}), contributions)
+        counts = Counter()
+        for field, texts in fields.items():
+            for text in texts:
+                for token in tokenize(text):
+                    counts[token] += FIELD_WEIGHTS[field]
+
+        docs.append({
+            'drawingNumber': drawing,
+            'folderPath': relative,
+            'title': (instruction.get('metadata') or {}).get('title', ''),
+        })
+        term_counts.append(counts)
+
+    vocabulary = {term: i for i, term in enumerate(sorted({t for c in term_counts for t in c}))}
+
+    rows, cols, values = [], [], []
+    for row, counts in enumerate(term_counts):
+        for term, count in counts.items():
+            rows.append(row)
+            cols.append(vocabulary[term])
+            values.append(count)
+
+    shape = (len(docs), len(vocabulary))
+    tf = sparse.csr_matrix(
+        (np.asarray(values, dtype=np.float32), (np.asarray(rows), np.asarray(cols))),
+        shape=shape,
+    )
+    # サブリニア TF: 1 + log(tf)
+    tf.data = 1.0 + np.log(tf.data)
+
+    df = np.bincount(tf.indices, minlength=shape[1])
+    idf = (np.log((1.0 + shape[0]) / (1.0 + df)) + 1.0).astype(np.float32)
+
+    tfidf = tf.multiply(idf).tocsr()
+    norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    tfidf = sparse.diags((1.0 / norms).astype(np.float32)) @ tfidf
+
+    return docs, vocabulary, idf, tfidf.tocsc().astype(np.float32)
+
+
+def save_index(output_dir, docs, vocabulary, idf, matrix):
+    output_dir.mkdir(parents=True, exist_ok=True)
+    matrix.sort_indices()
+    idf.astype('<f4').tofile(output_dir / 'idf.f32')
+    matrix.indptr.astype('<i4').tofile(output_dir / 'indptr.i32')
+    matrix.indices.astype('<i4').tofile(output_dir / 'indices.i32')
+    matrix.data.astype('<f4').tofile(output_dir / 'data.f32')
+
+    # meta.json は最後に書く（読み込み側はこれの更新日時でキャッシュを破棄する）
+    with open(output_dir / 'meta.json', 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': FORMAT_VERSION,
+            'createdAt': datetime.now(timezone.utc).isoformat(),
+            'docs': docs,
+            'vocabulary': vocabulary,
+            'nnz': int(matrix.nnz),
+        }, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def load_index(index_dir):
+    """保存済みインデックスを (docs, vocabulary, idf, CSC 行列) として読み込む"""
+    meta = load_json(index_dir / 'meta.json')
+    idf = np.fromfile(index_dir / 'idf.f32', dtype='<f4')
+    matrix = sparse.csc_matrix((
+        np.fromfile(index_dir / 'data.f32', dtype='<f4'),
+        np.fromfile(index_dir / 'indices.i32', dtype='<i4'),
+        np.fromfile(index_dir / 'indptr.i32', dtype='<i4'),
+    ), shape=(len(meta['docs']), len(meta['vocabulary'])))
+    return meta['docs'], meta['vocabulary'], idf, matrix
+
+
+def query_index(index, question, top_k=10):
+    """質問文に対する上位 top_k 図番を [(drawingNumber, score), ...] で返す"""
+    docs, vocabulary, idf, matrix = index
+    counts = Counter(t for t in tokenize(question) if t in vocabulary)
+    if not counts:
+        return []
+
+    cols = np.fromiter((vocabulary[t] for t in counts), dtype=np.int64)
+    weights = (1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32))) * idf[cols]
+    weights /= np.linalg.norm(weights)
+    query = sparse.csr_matrix(
+        (weights, (cols, np.zeros(len(cols), dtype=np.int64))), shape=(matrix.shape[1], 1))
+
+    scores = (matrix @ query).toarray().ravel()
+    top = np.argsort(-scores)[:top_k]
+    return [(docs[i]['drawingNumber'], float(scores[i])) for i in top if scores[i] > 0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='チャット検索用 TF-IDF インデックスの作成・検索')
+    parser.add_argument('--data-root', type=Path, default=Path(get_data_root()))
+    parser.add_argument('--query', help='作成せずに既存インデックスで検索する')
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    index_dir = args.data_root / INDEX_DIR
+
+    if args.query:
+        if not (index_dir / 'meta.json').exists():
+            print(f"❌ インデックスがありません: {index_dir}")
+            sys.exit(1)
+        for drawing, score in query_index(load_index(index_dir), args.query, args.top):
+            print(f"  {score:.4f}  {drawing}")
+        return
+
+    print("🔨 TF-IDF インデックスを作成中...")
+    started = time.monotonic()
+    docs, vocabulary, idf, matrix = build_index(args.data_root)
+    save_index(index_dir, docs, vocabulary, idf, matrix)
+
+    size = sum(p.stat().st_size for p in index_dir.iterdir())
+    print(f"  📊 図番数: {len(docs)} / 語彙数: {len(vocabulary)} / 非ゼロ要素: {matrix.nnz}")
+    print(f"  💾 {index_dir}（{size:,} bytes, {time.monotonic() - started:.2f}秒）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+instruction.json の重複 workSteps 削除・コンパクト化スクリプト
+
+旧形式の workSteps と新形式の workStepsByMachine に同じステップが二重に
+保存されている図番を検出し、workSteps が workStepsByMachine で完全に
+カバーされている場合に限って旧形式のコピーを削除する。あわせて JSON を
+空白なしのコンパクト形式で書き直す。
+
+カバー判定: workSteps の各ステップについて、workStepsByMachine のいずれかの
+機械種別に同じ stepNumber のステップがあり、内容（title, description など）が
+一致すること。workSteps 側の images / videos は削除前に workStepsByMachine 側へ
+（重複を除いて）結合する。
+
+書き込み後に読み直して内容が一致することを検証し、処理結果をジャーナル
+（.compaction-journal.jsonl）に記録する。元ファイルは .compaction-backup/ に
+退避するので --rollback で戻せる。ジャーナルに完了済みの図番は再実行時に
+スキップする。
+
+使い方:
+    python scripts/compact_work_steps.py --dry-run
+    python scripts/compact_work_steps.py -j 8
+    python scripts/compact_work_steps.py --rollback
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from drawing_paths import DrawingResolver, get_data_root
+from instruction_data import MACHINE_TYPES
+
+JOURNAL_NAME = '.compaction-journal.jsonl'
+BACKUP_DIR = '.compaction-backup'
+
+# 一致を確認する項目（workSteps 側に存在するもののみ比較する）
+CONTENT_FIELDS = [
+    'title', 'description', 'detailedInstructions', 'timeRequired', 'tools',
+    'notes', 'warningLevel', 'cuttingConditions', 'qualityCheck',
+]
+MEDIA_FIELDS = ['images', 'videos']
+
+
+def dump_compact(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def find_covering_step(legacy_step, by_machine):
+    for machine_type in MACHINE_TYPES:
+        for step in by_machine.get(machine_type) or []:
+            if step.get('stepNumber') != legacy_step.get('stepNumber'):
+                continue
+            if all(
+                legacy_step[field] == step.get(field)
+                for field in CONTENT_FIELDS if field in legacy_step
+            ):
+                return step
+    return None
+
+
+def compact_instruction(data):
+    """重複削除後のデータと、削除したかどうかを返す（data は変更する）"""
+    legacy_steps = data.get('workSteps')
+    by_machine = data.get('workStepsByMachine') or {}
+
+    if legacy_steps is None:
+        return data, False
+    if not legacy_steps:
+        del data['workSteps']
+        return data, True
+
+    matches = [(step, find_covering_step(step, by_machine)) for step in legacy_steps]
+    if any(covering is None for _, covering in matches):
+        return data, False
+
+    # workSteps にしかないメディア参照を移し替える（両方にある場合は重複を除いて結合）
+    for legacy_step, covering in matches:
+        for field in MEDIA_FIELDS:
+            merged = list(covering.get(field) or [])
+            merged += [m for m in legacy_step.get(field) or [] if m not in merged]
+            if merged:
+                covering[field] = merged
+
+    del data['workSteps']
+    return data, True
+
+
+def process_drawing(drawing, instruction_path, backup_path, dry_run):
+    """ワーカープロセスで実行: 1図番のコンパクト化と検証"""
+    raw = Path(instruction_path).read_bytes()
+    result = {
+        'drawing': drawing,
+        'bytesBefore': len(raw),
+        'sha256Before': hashlib.sha256(raw).hexdigest(),
+    }
+
+    try:
+        data = json.loads(raw)
+    except ValueError as e:
+        return {**result, 'status': 'error', 'message': f"JSONとして読み込めません: {e}"}
+
+    data, removed = compact_instruction(data)
+    compacted = dump_compact(data)
+    result.update({
+        'removedWorkSteps': removed,
+        'bytesAfter': len(compacted),
+        'sha256After': hashlib.sha256(compacted).hexdigest(),
+    })
+
+    if len(compacted) >= len(raw) and not removed:
+        return {**result, 'status': 'unchanged'}
+    if dry_run:
+        return {**result, 'status': 'dry-run'}
+
+    backup = Path(backup_path)
+    backup.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(instruction_path, backup)
+
+    temp_path = Path(f"{instruction_path}.tmp")
+    temp_path.write_bytes(compacted)
+    os.replace(temp_path, instruction_path)
+
+    # 検証: 読み直して期待した内容と一致するか
+    written = Path(instruction_path).read_bytes()
+    if hashlib.sha256(written).hexdigest() != result['sha256After'] or json.loads(written) != data:
+        shutil.copy2(backup, instruction_path)
+        return {**result, 'status': 'error', 'message': '検証に失敗したため元に戻しました'}
+
+    return {**result, 'status': 'compacted', 'backup': str(backup)}
+
+
+def load_journal(journal_path):
+    entries = {}
+    if journal_path.exists():
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    entries[entry['drawing']] = entry
+    return entries
+
+
+def rollback(data_root, journal_path):
+    journal = load_journal(journal_path)
+    restored = 0
+    for drawing, entry in sorted(journal.items()):
+        if entry.get('status') != 'compacted':
+            continue
+        target = data_root / 'work-instructions' / drawing / 'instruction.json'
+        backup = Path(entry['backup'])
+        current = hashlib.sha256(target.read_bytes()).hexdigest() if target.exists() else None
+        if current != entry['sha256After']:
+            # コンパクト化後に管理画面などで更新された図番は戻さない
+            print(f"SKIP {drawing}: 変換後に更新されています")
+            continue
+        shutil.copy2(backup, target)
+        restored += 1
+        print(f"RESTORED {drawing}")
+
+    journal_path.rename(journal_path.with_suffix(f".rolled-back-{datetime.now().strftime('%Y%m%d%H%M%S')}"))
+    print(f"\n合計: {restored}件を元に戻しました")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='重複 workSteps の削除と instruction.json のコンパクト化')
+    parser.add_argument('--data-root', type=Path, default=Path(get_data_root()))
+    parser.add_argument('--dry-run', action='store_true', help='書き込まずに削減量だけ報告する')
+    parser.add_argument('--rollback', action='store_true', help='ジャーナルに従って元に戻す')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    journal_path = args.data_root / JOURNAL_NAME
+    backup_root = args.data_root / BACKUP_DIR
+
+    if args.rollback:
+        rollback(args.data_root, journal_path)
+        return
+
+    journal = load_journal(journal_path)
+    targets = []
+    for drawing, instruction_path in DrawingResolver(args.data_root).iter_instruction_files():
+        done = journal.get(drawing)
+        if done and done.get('status') == 'compacted':
+            current = hashlib.sha256(instruction_path.read_bytes()).hexdigest()
+            if current == done['sha256After']:
+                continue
+        targets.append((drawing, instruction_path))
+
+    print(f"{'[DRY RUN] ' if args.dry_run else ''}Compacting {len(targets)} drawings "
+          f"({len(journal)} already in journal)...")
+    print("=" * 60)
+
+    saved = 0
+    counts = {'compacted': 0, 'dry-run': 0, 'unchanged': 0, 'error': 0}
+    journal_file = None if args.dry_run else open(journal_path, 'a', encoding='utf-8')
+
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = [
+                pool.submit(process_drawing, drawing, str(path),
+                            str(backup_root / drawing / 'instruction.json'), args.dry_run)
+                for drawing, path in targets
+            ]
+            for future in futures:
+                result = future.result()
+                counts[result['status']] += 1
+
+                if result['status'] in ('compacted', 'dry-run'):
+                    diff = result['bytesBefore'] - result['bytesAfter']
+                    saved += diff
+                    note = ' (workSteps removed)' if result['removedWorkSteps'] else ''
+                    print(f"OK {result['drawing']}: {result['bytesBefore']:,} -> "
+                          f"{result['bytesAfter']:,} bytes (-{diff:,}){note}")
+                elif result['status'] == 'error':
+                    print(f"ERROR {result['drawing']}: {result['message']}")
+
+                if journal_file and result['status'] != 'unchanged':
+                    journal_file.write(json.dumps({
+                        **result, 'timestamp': datetime.now(timezone.utc).isoformat()
+                    }, ensure_ascii=False) + '\n')
+                    journal_file.flush()
+    finally:
+        if journal_file:
+            journal_file.close()
+
+    print("\n" + "=" * 60)
+    print(f"Compacted: {counts['compacted'] + counts['dry-run']}, "
+          f"unchanged: {counts['unchanged']}, errors: {counts['error']}")
+    print(f"Total bytes saved: {saved:,}")
+    if counts['error']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
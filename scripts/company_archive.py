@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+会社単位のデータアーカイブ作成・復元スクリプト
+
+companies.json から会社/製品に属する図番を選び、work-instructions 配下の
+フォルダを1つのアーカイブ(.tar)にまとめる。圧縮はファイル単位で複数スレッドで
+並列に行い、動画や画像など圧縮済みのメディアは再圧縮せずそのまま格納する。
+各ファイルの SHA-256 を manifest.json に記録し、復元時は全ファイルを検証してから
+置き換える（1件でも破損していれば何も書き換えない）。
+media_tiering.py で二次ストレージへ移動した動画も同じパスで格納し、
+復元時は高速領域に書き戻す。
+
+使い方:
+    python scripts/company_archive.py export demo-manufacturing-a -o export.tar
+    python scripts/company_archive.py export demo-manufacturing-a --product demo-shaft-series
+    python scripts/company_archive.py import export.tar --data-root ./public/data_restore
+"""
+
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+import tarfile
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path, PurePosixPath
+
+from drawing_paths import DrawingResolver, folder_name, get_data_root, save_index, shard_path
+from media_tiering import cold_path, load_manifest, manifest_key
+from validate_instructions import validate_instruction
+
+ARCHIVE_VERSION = "1.0"
+MANIFEST_NAME = "manifest.json"
+
+# 圧縮済みのため再圧縮しない拡張子
+STORED_EXTENSIONS = {
+    '.mp4', '.mov', '.avi', '.webm', '.m4v', '.wmv',
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.tif', '.tiff', '.jfif',
+    '.pdf', '.zip', '.gz', '.7z',
+}
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+class HashingReader:
+    """読み出した内容の SHA-256 を同時に計算するファイルラッパー"""
+
+    def __init__(self, f):
+        self.f = f
+        self.digest = hashlib.sha256()
+
+    def read(self, size=-1):
+        data = self.f.read(size)
+        self.digest.update(data)
+        return data
+
+
+def select_companies(companies_data, company_id, product_ids):
+    """対象会社・製品だけを残した companies.json の部分集合を返す"""
+    for company in companies_data.get('companies', []):
+        if company['id'] != company_id:
+            continue
+        products = company.get('products', [])
+        if product_ids:
+            products = [p for p in products if p['id'] in product_ids]
+            missing = set(product_ids) - {p['id'] for p in products}
+            if missing:
+                raise ValueError(f"製品が見つかりません: {', '.join(sorted(missing))}")
+        return {**company, 'products': products}
+    raise ValueError(f"会社が見つかりません: {company_id}")
+
+
+def prepare_entry(source, arcname):
+    """ワーカースレッドで実行: チェックサム計算と（必要なら）圧縮
+
+    zlib と hashlib は処理中に GIL を解放するため、スレッドで複数コアを使える。
+    そのまま格納するファイルは読み込みを1回で済ませるため、チェックサムは
+    アーカイブへ書き込みながら計算する。
+    """
+    if source.suffix.lower() in STORED_EXTENSIONS:
+        return {
+            'path': arcname,
+            'size': source.stat().st_size,
+            'sha256': None,
+            'encoding': 'stored',
+            'source': source,
+            'payload': None,
+        }
+
+    raw = source.read_bytes()
+    return {
+        'path': arcname,
+        'size': len(raw),
+        'sha256': hashlib.sha256(raw).hexdigest(),
+        'encoding': 'gzip',
+        'source': source,
+        'payload': gzip.compress(raw, compresslevel=6, mtime=0),
+    }
+
+
+def add_bytes(tar, name, data, mtime):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = mtime
+    tar.addfile(info, io.BytesIO(data))
+
+
+def export_archive(data_root, company_id, product_ids, output, workers):
+    companies_data = load_json(data_root / 'companies.json')
+    company = select_companies(companies_data, company_id, product_ids)
+    drawings = [d for p in company['products'] for d in p.get('drawings', [])]
+
+    print(f"📦 アーカイブ作成: {company['name']} ({len(drawings)}図番)")
+
+    search_index_path = data_root / 'search-index.json'
+    index_entries = []
+    if search_index_path.exists():
+        drawing_set = set(drawings)
+        index_entries = [
+            d for d in load_json(search_index_path).get('drawings', [])
+            if d.get('drawingNumber') in drawing_set
+        ]
+
+    # アーカイブ内は常に flat 配置のパス（work-instructions/drawing-<図番>/...）で格納する
+    resolver = DrawingResolver(data_root)
+    tiers = load_manifest(data_root)
+    files = []
+    missing_cold = []
+    for drawing in drawings:
+        drawing_dir = resolver.resolve(drawing)
+        if not drawing_dir.exists():
+            print(f"  ⚠️ フォルダが見つかりません: {folder_name(drawing)}")
+            continue
+        for path in sorted(drawing_dir.rglob('*')):
+            if path.is_file():
+                arcname = f"work-instructions/{folder_name(drawing)}/{path.relative_to(drawing_dir).as_posix()}"
+                files.append((path, arcname))
+
+        # 二次ストレージへ移動済みの動画（高速領域に書き戻されたものは上で格納済み）
+        prefix = manifest_key(data_root, drawing_dir) + '/'
+        for key in sorted(k for k in tiers['files'] if k.startswith(prefix)):
+            if data_root.joinpath(*key.split('/')).exists():
+                continue
+            source = cold_path(tiers['coldRoot'], key) if tiers['coldRoot'] else None
+            if source is None or not source.is_file():
+                missing_cold.append(key)
+                continue
+            files.append((source, f"work-instructions/{folder_name(drawing)}/{key[len(prefix):]}"))
+
+    if missing_cold:
+        for key in missing_cold:
+            print(f"  ❌ 二次ストレージのファイルを読めません: {key}")
+        raise FileNotFoundError(
+            f"{len(missing_cold)}件の動画が二次ストレージ（{tiers['coldRoot']}）にありません")
+
+    started = time.monotonic()
+    now = int(time.time())
+    entries = []
+    raw_bytes = 0
+    archived_bytes = 0
+
+    with tarfile.open(output, 'w') as tar, ThreadPoolExecutor(max_workers=workers) as pool:
+        # 順序を保ったまま、先読み数を制限してメモリ使用量を抑える
+        pending = deque()
+        queue = iter(files)
+
+        def fill():
+            while len(pending) < workers * 2:
+                item = next(queue, None)
+                if item is None:
+                    return
+                pending.append(pool.submit(prepare_entry, *item))
+
+        fill()
+        while pending:
+            entry = pending.popleft().result()
+            fill()
+
+            source = entry.pop('source')
+            payload = entry.pop('payload')
+            if payload is None:
+                info = tar.gettarinfo(str(source), arcname=entry['path'])
+                with open(source, 'rb') as f:
+                    reader = HashingReader(f)
+                    tar.addfile(info, reader)
+                entry['sha256'] = reader.digest.hexdigest()
+                archived = entry['size']
+            else:
+                add_bytes(tar, entry['path'] + '.gz', payload, now)
+                archived = len(payload)
+
+            raw_bytes += entry['size']
+            archived_bytes += archived
+            entries.append(entry)
+
+        add_bytes(tar, 'companies.json', json.dumps(
+            {'companies': [company]}, ensure_ascii=False, indent=2).encode('utf-8'), now)
+        add_bytes(tar, 'search-index.json', json.dumps(
+            {'drawings': index_entries}, ensure_ascii=False, indent=2).encode('utf-8'), now)
+
+        manifest = {
+            'version': ARCHIVE_VERSION,
+            'createdAt': datetime.now(timezone.utc).isoformat(),
+            'companyId': company_id,
+            'productIds': [p['id'] for p in company['products']],
+            'drawings': drawings,
+            'files': entries,
+        }
+        add_bytes(tar, MANIFEST_NAME, json.dumps(
+            manifest, ensure_ascii=False, indent=2).encode('utf-8'), now)
+
+    elapsed = time.monotonic() - started
+    print(f"  📊 ファイル数: {len(entries)}")
+    print(f"  📊 元サイズ: {raw_bytes:,} bytes / 格納サイズ: {archived_bytes:,} bytes")
+    print(f"  ⏱️ {elapsed:.1f}秒 ({workers}スレッド)")
+    print(f"💾 保存しました: {output}")
+
+
+def safe_target(drawing_dirs, arcname):
+    """アーカイブ内パスを検証し、復元先レイアウトでの書き込み先を返す"""
+    posix = PurePosixPath(arcname)
+    if posix.is_absolute() or '..' in posix.parts or posix.parts[:1] != ('work-instructions',) \
+            or len(posix.parts) < 3 or posix.parts[1] not in drawing_dirs:
+        raise ValueError(f"不正なパスです: {arcname}")
+    return drawing_dirs[posix.parts[1]].joinpath(*posix.parts[2:])
+
+
+def merge_companies(target_path, imported):
+    """取り込んだ会社・製品・図番を既存の companies.json にマージ"""
+    data = load_json(target_path) if target_path.exists() else {'companies': [], 'metadata': {}}
+    companies = {c['id']: c for c in data['companies']}
+
+    for company in imported['companies']:
+        existing = companies.get(company['id'])
+        if existing is None:
+            data['companies'].append(company)
+            continue
+        products = {p['id']: p for p in existing.setdefault('products', [])}
+        for product in company['products']:
+            current = products.get(product['id'])
+            if current is None:
+                existing['products'].append(product)
+                continue
+            for drawing in product.get('drawings', []):
+                if drawing not in current['drawings']:
+                    current['drawings'].append(drawing)
+            current['drawingCount'] = len(current['drawings'])
+
+    data.setdefault('metadata', {})['lastUpdated'] = datetime.now(timezone.utc).isoformat()
+    save_json(target_path, data)
+
+
+def merge_search_index(target_path, imported):
+    data = load_json(target_path) if target_path.exists() else {'drawings': [], 'metadata': {}}
+    imported_numbers = {d['drawingNumber'] for d in imported['drawings']}
+    data['drawings'] = [
+        d for d in data['drawings'] if d.get('drawingNumber') not in imported_numbers
+    ] + imported['drawings']
+
+    metadata = data.setdefault('metadata', {})
+    metadata['totalDrawings'] = len(data['drawings'])
+    metadata['lastIndexed'] = datetime.now(timezone.utc).isoformat()
+    save_json(target_path, data)
+
+
+def read_entry(tar, entry):
+    member = entry['path'] + ('.gz' if entry['encoding'] == 'gzip' else '')
+    source = tar.extractfile(member)
+    if entry['encoding'] == 'gzip':
+        source = gzip.GzipFile(fileobj=source)
+    return source
+
+
+def validate_archive(tar, manifest):
+    """復元前に instruction.json をスキーマ検証する"""
+    invalid = 0
+    for entry in manifest['files']:
+        if PurePosixPath(entry['path']).name != 'instruction.json':
+            continue
+        errors = validate_instruction(json.load(read_entry(tar, entry)))
+        if errors:
+            invalid += 1
+            print(f"  ❌ {entry['path']}")
+            for pointer, message in errors:
+                print(f"    - {pointer}: {message}")
+    if invalid:
+        raise ValueError(f"{invalid}件の instruction.json がスキーマ検証に失敗しました（--skip-validation で無視）")
+
+
+def import_archive(archive, data_root, overwrite, skip_validation=False):
+    with tarfile.open(archive, 'r') as tar:
+        manifest = json.load(tar.extractfile(MANIFEST_NAME))
+        print(f"📥 アーカイブ復元: {manifest['companyId']} ({len(manifest['drawings'])}図番)")
+
+        # 既存の図番はその場所へ、新規の図番は復元先のレイアウトに従って配置する
+        resolver = DrawingResolver(data_root)
+        layout = resolver.layout or 'flat'
+        new_paths = {}
+        drawing_dirs = {}
+        existing = []
+        for d in manifest['drawings']:
+            current = resolver.resolve(d)
+            if current.exists():
+                existing.append(d)
+                drawing_dirs[folder_name(d)] = current
+            else:
+                new_paths[d] = shard_path(layout, d, manifest['companyId'])
+                drawing_dirs[folder_name(d)] = data_root / 'work-instructions' / new_paths[d]
+
+        if existing and not overwrite:
+            raise FileExistsError(
+                f"既に存在する図番があります: {', '.join(existing)}（--overwrite で上書き）")
+
+        if not skip_validation:
+            validate_archive(tar, manifest)
+
+        # 全ファイルを一時ファイルに書き出して検証してから置き換える
+        # （破損したアーカイブで既存の図番フォルダを上書きしたり、途中まで復元した
+        # フォルダを残したりしない）
+        staged = []
+        errors = []
+        try:
+            for entry in manifest['files']:
+                target = safe_target(drawing_dirs, entry['path'])
+                temp_path = target.with_name(f".{target.name}.tmp")
+                source = read_entry(tar, entry)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                digest = hashlib.sha256()
+                with open(temp_path, 'wb') as f:
+                    staged.append((temp_path, target))
+                    for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+                        digest.update(chunk)
+                        f.write(chunk)
+
+                if digest.hexdigest() != entry['sha256']:
+                    errors.append(entry['path'])
+                    print(f"  ❌ チェックサム不一致: {entry['path']}")
+
+            if errors:
+                raise ValueError(f"{len(errors)}件のファイルが破損しています（何も復元していません）")
+        except BaseException:
+            for temp_path, _ in staged:
+                temp_path.unlink(missing_ok=True)
+            for d in new_paths:
+                shutil.rmtree(drawing_dirs[folder_name(d)], ignore_errors=True)
+            raise
+
+        for temp_path, target in staged:
+            os.replace(temp_path, target)
+
+        merge_companies(data_root / 'companies.json', json.load(tar.extractfile('companies.json')))
+        merge_search_index(data_root / 'search-index.json', json.load(tar.extractfile('search-index.json')))
+
+        if resolver.paths is not None and new_paths:
+            save_index(data_root, layout, {**resolver.paths, **new_paths})
+
+    print(f"  ✅ {len(manifest['files'])}ファイルを検証・復元しました")
+    print(f"💾 復元先: {data_root}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='会社単位のデータアーカイブ作成・復元')
+    parser.add_argument('--data-root', type=Path, default=Path(get_data_root()),
+                        help='データルート（既定: 環境変数 DEV_DATA_ROOT_PATH / DATA_ROOT_PATH）')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = sub.add_parser('export', help='アーカイブを作成')
+    export_parser.add_argument('company_id')
+    export_parser.add_argument('--product', action='append', default=[], dest='products',
+                               help='対象製品ID（複数指定可、省略時は全製品）')
+    export_parser.add_argument('-o', '--output', type=Path)
+    export_parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1)
+
+    import_parser = sub.add_parser('import', help='アーカイブを復元')
+    import_parser.add_argument('archive', type=Path)
+    import_parser.add_argument('--overwrite', action='store_true')
+    import_parser.add_argument('--skip-validation', action='store_true',
+                               help='instruction.json のスキーマ検証を行わない')
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'export':
+            output = args.output or Path(
+                f"{args.company_id}-{datetime.now().strftime('%Y%m%d')}.tar")
+            export_archive(args.data_root, args.company_id, args.products, output, args.workers)
+        else:
+            import_archive(args.archive, args.data_root, args.overwrite, args.skip_validation)
+    except (ValueError, FileExistsError, FileNotFoundError, KeyError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
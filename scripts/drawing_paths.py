@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+図番フォルダの場所解決（データ用スクリプト共通）
+
+work-instructions 配下は次のいずれかのレイアウトで配置できる。
+    flat     work-instructions/drawing-<図番>/            （従来）
+    company  work-instructions/<会社ID>/drawing-<図番>/
+    hash     work-instructions/<図番の SHA-1 先頭2桁>/drawing-<図番>/
+
+データルートの drawing-paths.json（図番 → work-instructions からの相対パス）が
+あればそれを引いて O(1) で解決する。無い場合や索引に無い図番は従来の
+flat 配置として扱うので、移行中は両方のレイアウトが混在していてもよい。
+索引の作成・レイアウトの移行は shard_work_instructions.py で行う。
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path, PurePosixPath
+
+INDEX_NAME = 'drawing-paths.json'
+LAYOUTS = ('flat', 'company', 'hash')
+FOLDER_PREFIX = 'drawing-'
+UNASSIGNED_COMPANY = '_unassigned'
+
+
+def get_data_root():
+    """環境変数からデータルートを決定（src/lib/admin/utils.ts の getDataPath に準拠）"""
+    if os.environ.get('USE_NAS') == 'true':
+        return os.environ.get('DATA_ROOT_PATH', 'public/data')
+    return os.environ.get('DEV_DATA_ROOT_PATH') or os.environ.get('DATA_ROOT_PATH', 'public/data')
+
+
+def folder_name(drawing_number):
+    return f"{FOLDER_PREFIX}{drawing_number}"
+
+
+def shard_path(layout, drawing_number, company_id=None):
+    """レイアウトに応じた work-instructions からの相対パス（POSIX 形式）"""
+    name = folder_name(drawing_number)
+    if layout == 'flat':
+        return name
+    if layout == 'company':
+        return f"{company_id or UNASSIGNED_COMPANY}/{name}"
+    if layout == 'hash':
+        prefix = hashlib.sha1(drawing_number.encode('utf-8')).hexdigest()[:2]
+        return f"{prefix}/{name}"
+    raise ValueError(f"不明なレイアウトです: {layout}")
+
+
+def load_index(data_root):
+    """drawing-paths.json を読み込む（無ければ None）"""
+    index_path = Path(data_root) / INDEX_NAME
+    if not index_path.exists():
+        return None
+    with open(index_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_index(data_root, layout, paths):
+    index_path = Path(data_root) / INDEX_NAME
+    temp_path = index_path.with_suffix('.json.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'layout': layout, 'paths': dict(sorted(paths.items()))},
+                  f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temp_path, index_path)
+
+
+def scan_drawing_dirs(data_root):
+    """索引を使わずに図番フォルダを探す（flat と1階層下の両方）
+
+    {図番: 相対パス} を返す。
+    """
+    base_path = Path(data_root) / 'work-instructions'
+    found = {}
+    if not base_path.exists():
+        return found
+    for entry in sorted(base_path.iterdir()):
+        if not entry.is_dir():
+            continue
+        if entry.name.startswith(FOLDER_PREFIX):
+            found[entry.name[len(FOLDER_PREFIX):]] = entry.name
+            continue
+        for child in sorted(entry.iterdir()):
+            if child.is_dir() and child.name.startswith(FOLDER_PREFIX):
+                found[child.name[len(FOLDER_PREFIX):]] = f"{entry.name}/{child.name}"
+    return found
+
+
+class DrawingResolver:
+    """図番 → フォルダの解決（索引があれば索引、無ければ走査結果を使う）"""
+
+    def __init__(self, data_root):
+        self.data_root = Path(data_root)
+        self.base_path = self.data_root / 'work-instructions'
+        index = load_index(self.data_root)
+        self.layout = index['layout'] if index else None
+        self.paths = index['paths'] if index else None
+
+    def relative_path(self, drawing_number):
+        if self.paths and drawing_number in self.paths:
+            return self.paths[drawing_number]
+        return folder_name(drawing_number)
+
+    def resolve(self, drawing_number):
+        """図番フォルダの絶対パス（存在確認はしない）"""
+        return self.base_path.joinpath(*PurePosixPath(self.relative_path(drawing_number)).parts)
+
+    def all_paths(self):
+        """{図番: 相対パス}
+
+        索引が無ければ全体を走査する。索引がある場合も、管理画面などで
+        索引作成後に flat 配置で追加された図番を拾うため最上位だけは見る
+        （シャード配置では最上位はシャード名だけなので小さい）。
+        """
+        if self.paths is None:
+            return scan_drawing_dirs(self.data_root)
+        paths = dict(self.paths)
+        if self.base_path.exists():
+            for entry in self.base_path.iterdir():
+                if entry.name.startswith(FOLDER_PREFIX) and entry.is_dir():
+                    paths.setdefault(entry.name[len(FOLDER_PREFIX):], entry.name)
+        return paths
+
+    def iter_instruction_files(self):
+        """(相対パス, instruction.json のパス) を図番順に返す"""
+        for _, relative in sorted(self.all_paths().items()):
+            instruction_file = self.base_path.joinpath(*PurePosixPath(relative).parts) / 'instruction.json'
+            if instruction_file.exists():
+                yield relative, instruction_file
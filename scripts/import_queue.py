@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+一括取り込みジョブキュー（SQLite）
+
+新規顧客の取り込みで扱う Excel ワークブックとメディアファイルを、ジョブとして
+データルートの .import-queue.sqlite3 に登録し、並列数を制限して順に処理する。
+ジョブの状態は pending → running → done / failed で管理し、失敗したジョブは
+待ち時間を延ばしながら --max-attempts 回まで再試行する。
+
+途中で止めても（Ctrl+C・クラッシュ）、次回の run で実行中だったジョブを
+pending に戻して続きから処理する。完了済みのジョブは繰り返さない。
+メディアのバッチは、コピー先に同じサイズのファイルが既にあればスキップ
+するので、バッチの途中で止まった場合も再コピーは残りの分だけになる。
+
+ジョブの種類（ステージ）:
+    workbook  read_excel_data.py で読み込み・整合性チェックし、結果を
+              import-staging/<図番>.json に保存する
+    media     取り込み元フォルダのファイルを図番フォルダへコピーする
+              （images/ videos/ pdfs/ programs/ のサブフォルダ配下はその構成のまま、
+              これらの直下のファイルは同じ種類の overview/ へ、
+              それ以外は拡張子で振り分けて overview/ へ）
+
+使い方:
+    python scripts/import_queue.py enqueue-workbooks doc/import_files
+    python scripts/import_queue.py enqueue-media doc/import_files/12750800122_リテーナ 12750800122
+    python scripts/import_queue.py run -j 4
+    python scripts/import_queue.py status
+    python scripts/import_queue.py retry-failed
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timezone
+from pathlib import Path
+
+from drawing_paths import DrawingResolver, get_data_root
+
+DB_NAME = '.import-queue.sqlite3'
+STAGING_DIR = 'import-staging'
+STAGES = ('workbook', 'media')
+
+MEDIA_FOLDERS = ('images', 'videos', 'pdfs', 'programs')
+MEDIA_EXTENSIONS = {
+    'images': {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.tif', '.tiff', '.jfif'},
+    'videos': {'.mp4', '.webm', '.avi', '.mov', '.wmv'},
+    'pdfs': {'.pdf'},
+    'programs': {'.nc', '.min', '.cam', '.dxf', '.dwg', '.stp', '.step', '.zip'},
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    stage TEXT NOT NULL,
+    source TEXT NOT NULL,
+    target TEXT,
+    payload TEXT NOT NULL DEFAULT '{}',
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    not_before REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    result TEXT,
+    items INTEGER NOT NULL DEFAULT 0,
+    bytes INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    UNIQUE (stage, source)
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, not_before);
+CREATE TABLE IF NOT EXISTS runner (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    pid INTEGER NOT NULL,
+    started_at TEXT NOT NULL
+);
+"""
+
+
+class PermanentError(Exception):
+    """再試行しても結果が変わらない失敗（入力データの不備など）"""
+
+
+def connect(data_root):
+    conn = sqlite3.connect(Path(data_root) / DB_NAME, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def enqueue(conn, stage, source, target=None, payload=None):
+    """登録済み（同じステージ・取り込み元）のジョブは追加しない。追加したら True"""
+    cursor = conn.execute(
+        'INSERT OR IGNORE INTO jobs (stage, source, target, payload, created_at) VALUES (?, ?, ?, ?, ?)',
+        (stage, source, target, json.dumps(payload or {}, ensure_ascii=False), now_iso()),
+    )
+    return cursor.rowcount > 0
+
+
+# ---------------------------------------------------------------------------
+# ジョブの処理（ワーカープロセスで実行）
+# ---------------------------------------------------------------------------
+
+def run_workbook_job(source, staging_dir):
+    from read_excel_data import read_excel_data, validate_data_integrity
+
+    # read_excel_data.py は進捗を print するので、ワーカーでは捨てる
+    with contextlib.redirect_stdout(io.StringIO()):
+        sheets_data = read_excel_data(source)
+        if sheets_data is None:
+            raise PermanentError('Excelファイルを読み込めません')
+        validation = validate_data_integrity(sheets_data)
+
+    if not validation['is_valid']:
+        raise PermanentError('; '.join(validation['errors']))
+
+    drawing_number = validation['summary'].get('drawing_number') or Path(source).stem
+    output_path = Path(staging_dir) / f"{drawing_number}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = output_path.with_suffix('.json.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'file_path': source,
+            'sheets_data': {name: df.to_dict('records') for name, df in sheets_data.items()},
+            'validation_results': validation,
+        }, f, ensure_ascii=False, indent=2, default=str)
+    os.replace(temp_path, output_path)
+
+    return {
+        'items': sum(len(df) for df in sheets_data.values()),
+        'bytes': Path(source).stat().st_size,
+        'result': {'drawingNumber': drawing_number, 'output': str(output_path),
+                   'warnings': validation['warnings']},
+    }
+
+
+def media_destination(relative):
+    """取り込み元フォルダからの相対パス → 図番フォルダからの相対パス"""
+    parts = Path(relative).parts
+    if len(parts) > 2 and parts[0] in MEDIA_FOLDERS:
+        return Path(*parts)
+    if len(parts) == 2 and parts[0] in MEDIA_FOLDERS:
+        # 画面は overview / step_XX のサブフォルダしか表示しないので直下のファイルは overview へ
+        return Path(parts[0], 'overview', parts[1])
+    suffix = Path(relative).suffix.lower()
+    for folder, extensions in MEDIA_EXTENSIONS.items():
+        if suffix in extensions:
+            return Path(folder, 'overview', Path(relative).name)
+    return None
+
+
+def run_media_job(source, drawing_dir, files):
+    copied = skipped = total_bytes = 0
+    for relative in files:
+        source_file = Path(source) / relative
+        destination = media_destination(relative)
+        if destination is None:
+            continue
+        target = Path(drawing_dir) / destination
+        size = source_file.stat().st_size
+
+        # 前回途中まで処理したバッチの続き: コピー済みのファイルは飛ばす
+        if target.exists() and target.stat().st_size == size:
+            skipped += 1
+            continue
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = target.with_name(f".{target.name}.tmp")
+        shutil.copy2(source_file, temp_path)
+        os.replace(temp_path, target)
+        copied += 1
+        total_bytes += size
+
+    return {
+        'items': copied,
+        'bytes': total_bytes,
+        'result': {'copied': copied, 'skipped': skipped},
+    }
+
+
+def run_job(stage, source, target, payload):
+    """ワーカーのエントリポイント。(成功したか, 結果 or エラー, 再試行可能か) を返す"""
+    try:
+        if stage == 'workbook':
+            return True, run_workbook_job(source, target), False
+        if stage == 'media':
+            return True, run_media_job(source, target, payload['files']), False
+        return False, f"不明なステージです: {stage}", False
+    except PermanentError as e:
+        return False, str(e), False
+    except ImportError as e:
+        # pandas などが入っていない環境では再試行しても同じ
+        return False, f"{type(e).__name__}: {e}", False
+    except Exception as e:
+        return False, f"{type(e).__name__}: {e}", True
+
+
+# ---------------------------------------------------------------------------
+# コマンド
+# ---------------------------------------------------------------------------
+
+def command_enqueue_workbooks(args, conn):
+    added = 0
+    for path in args.paths:
+        path = Path(path)
+        workbooks = sorted(path.rglob('*.xlsx')) if path.is_dir() else [path]
+        for workbook in workbooks:
+            # Excel が開いている間にできるロックファイルは除く
+            if workbook.name.startswith('~$'):
+                continue
+            added += enqueue(conn, 'workbook', str(workbook.resolve()))
+    print(f"📥 ワークブックのジョブを {added}件 追加しました")
+
+
+def command_enqueue_media(args, conn):
+    source = Path(args.source).resolve()
+    if not source.is_dir():
+        print(f"❌ フォルダが見つかりません: {source}")
+        sys.exit(1)
+
+    files = [
+        p for p in sorted(source.rglob('*'))
+        if p.is_file() and not p.name.startswith(('.', '~$'))
+        and media_destination(p.relative_to(source)) is not None
+    ]
+
+    added = existing = 0
+    for start in range(0, len(files), args.batch_size):
+        batch = files[start:start + args.batch_size]
+        # バッチの識別は 取り込み元フォルダ + 図番 + ファイル一覧（サイズ・更新時刻込み）のハッシュ
+        # （ファイルの追加でバッチの区切りがずれても新しいバッチとして登録される。
+        # 既にコピー済みのファイルは実行時に同じサイズならスキップされる）
+        digest = hashlib.sha256()
+        for path in batch:
+            stat = path.stat()
+            digest.update(f"{path.relative_to(source).as_posix()}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode('utf-8'))
+        key = f"{source}#{args.drawing}#{digest.hexdigest()[:16]}"
+        payload = {'root': str(source), 'files': [p.relative_to(source).as_posix() for p in batch]}
+        if enqueue(conn, 'media', key, args.drawing, payload):
+            added += 1
+        else:
+            existing += 1
+    print(f"📥 メディアのジョブを {added}件 追加しました（{len(files)}ファイル, {args.batch_size}件/バッチ）")
+    if existing:
+        print(f"  ⏭️ 同じ内容のバッチが登録済みのため {existing}件 は追加していません")
+
+
+def acquire_runner(conn):
+    row = conn.execute('SELECT pid FROM runner WHERE id = 1').fetchone()
+    if row and row['pid'] != os.getpid():
+        try:
+            os.kill(row['pid'], 0)
+        except OSError:
+            pass
+        else:
+            print(f"❌ 別のプロセス（PID {row['pid']}）が実行中です")
+            sys.exit(1)
+    conn.execute('INSERT OR REPLACE INTO runner (id, pid, started_at) VALUES (1, ?, ?)', (os.getpid(), now_iso()))
+
+
+def command_run(args, conn):
+    acquire_runner(conn)
+
+    # 前回中断されたジョブを再開対象に戻す
+    resumed = conn.execute("UPDATE jobs SET state = 'pending' WHERE state = 'running'").rowcount
+    if resumed:
+        print(f"🔄 中断されていた {resumed}件 のジョブを再開します")
+
+    resolver = DrawingResolver(args.data_root)
+    staging_dir = str(args.data_root / STAGING_DIR)
+
+    def next_jobs(limit):
+        return conn.execute(
+            "SELECT * FROM jobs WHERE state = 'pending' AND not_before <= ? "
+            "ORDER BY stage = 'media', id LIMIT ?",
+            (time.time(), limit),
+        ).fetchall()
+
+    def submit(pool, job):
+        conn.execute(
+            "UPDATE jobs SET state = 'running', attempts = attempts + 1, started_at = ? WHERE id = ?",
+            (time.time(), job['id']),
+        )
+        payload = json.loads(job['payload'])
+        if job['stage'] == 'media':
+            source, target = payload['root'], str(resolver.resolve(job['target']))
+        else:
+            source, target = job['source'], staging_dir
+        return pool.submit(run_job, job['stage'], source, target, payload)
+
+    done = failed = 0
+    started = time.monotonic()
+    running = {}
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            while True:
+                for job in next_jobs(args.workers - len(running)):
+                    running[submit(pool, job)] = job
+
+                if not running:
+                    waiting = conn.execute(
+                        "SELECT MIN(not_before) FROM jobs WHERE state = 'pending'"
+                    ).fetchone()[0]
+                    if waiting is None:
+                        break
+                    # 再試行待ちのジョブしか無い場合は待つ
+                    time.sleep(max(0.0, min(waiting - time.time(), 5.0)))
+                    continue
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    job = running.pop(future)
+                    ok, outcome, retryable = future.result()
+                    label = f"[{job['stage']}] {Path(job['source'].split('#')[0]).name}"
+
+                    if ok:
+                        conn.execute(
+                            "UPDATE jobs SET state = 'done', finished_at = ?, items = ?, bytes = ?, "
+                            "result = ?, last_error = NULL WHERE id = ?",
+                            (time.time(), outcome['items'], outcome['bytes'],
+                             json.dumps(outcome['result'], ensure_ascii=False), job['id']),
+                        )
+                        done += 1
+                        print(f"  ✅ {label}: {outcome['result']}")
+                    elif retryable and job['attempts'] + 1 < args.max_attempts:
+                        delay = args.retry_delay * 2 ** job['attempts']
+                        conn.execute(
+                            "UPDATE jobs SET state = 'pending', not_before = ?, last_error = ? WHERE id = ?",
+                            (time.time() + delay, outcome, job['id']),
+                        )
+                        print(f"  🔁 {label}: {outcome}（{delay:.0f}秒後に再試行）")
+                    else:
+                        conn.execute(
+                            "UPDATE jobs SET state = 'failed', finished_at = ?, last_error = ? WHERE id = ?",
+                            (time.time(), outcome, job['id']),
+                        )
+                        failed += 1
+                        print(f"  ❌ {label}: {outcome}")
+    except KeyboardInterrupt:
+        print("\n⏸️ 中断しました。再度 run を実行すると続きから処理します")
+    finally:
+        conn.execute('DELETE FROM runner WHERE id = 1 AND pid = ?', (os.getpid(),))
+
+    print(f"\n完了: {done}件, 失敗: {failed}件（{time.monotonic() - started:.1f}秒）")
+    print_status(conn)
+    if failed:
+        sys.exit(1)
+
+
+def print_status(conn):
+    print("\n📊 ステージ別の状況")
+    print("=" * 72)
+    for stage in STAGES:
+        counts = dict(conn.execute(
+            'SELECT state, COUNT(*) FROM jobs WHERE stage = ? GROUP BY state', (stage,)
+        ).fetchall())
+        if not counts:
+            continue
+        row = conn.execute(
+            "SELECT COUNT(*), SUM(items), SUM(bytes), SUM(finished_at - started_at), "
+            "MIN(started_at), MAX(finished_at) FROM jobs WHERE stage = ? AND state = 'done'",
+            (stage,),
+        ).fetchone()
+        jobs, items, total_bytes, busy, first, last = row
+        wall = (last - first) if jobs else 0
+
+        states = ', '.join(f"{state} {counts.get(state, 0)}" for state in ('pending', 'running', 'done', 'failed'))
+        print(f"{stage:<10}{states}")
+        if jobs and wall > 0:
+            print(f"{'':<10}{jobs / wall:.2f} ジョブ/秒, {(items or 0) / wall:.1f} 件/秒, "
+                  f"{(total_bytes or 0) / wall / 1024 / 1024:.2f} MB/秒"
+                  f"（ジョブ平均 {busy / jobs:.2f}秒）")
+
+    for job in conn.execute("SELECT stage, source, attempts, last_error FROM jobs WHERE state = 'failed'"):
+        print(f"  ❌ [{job['stage']}] {job['source']}（{job['attempts']}回）: {job['last_error']}")
+
+
+def command_retry_failed(args, conn):
+    count = conn.execute(
+        "UPDATE jobs SET state = 'pending', attempts = 0, not_before = 0 WHERE state = 'failed'"
+    ).rowcount
+    print(f"🔁 失敗した {count}件 のジョブを再登録しました")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='一括取り込みジョブキュー')
+    parser.add_argument('--data-root', type=Path, default=Path(get_data_root()))
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    workbooks = subparsers.add_parser('enqueue-workbooks', help='Excel ワークブックをジョブとして登録')
+    workbooks.add_argument('paths', nargs='+', help='.xlsx ファイルまたはフォルダ')
+
+    media = subparsers.add_parser('enqueue-media', help='メディアフォルダをバッチに分けて登録')
+    media.add_argument('source', help='取り込み元フォルダ')
+    media.add_argument('drawing', help='取り込み先の図番')
+    media.add_argument('--batch-size', type=int, default=50)
+
+    run = subparsers.add_parser('run', help='ジョブを実行')
+    run.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1)
+    run.add_argument('--max-attempts', type=int, default=3)
+    run.add_argument('--retry-delay', type=float, default=5.0, help='初回再試行までの秒数（以降倍々）')
+
+    subparsers.add_parser('status', help='ステージ別の状況とスループット')
+    subparsers.add_parser('retry-failed', help='失敗したジョブを再登録')
+
+    args = parser.parse_args()
+    conn = connect(args.data_root)
+
+    if args.command == 'enqueue-workbooks':
+        command_enqueue_workbooks(args, conn)
+    elif args.command == 'enqueue-media':
+        command_enqueue_media(args, conn)
+    elif args.command == 'run':
+        command_run(args, conn)
+    elif args.command == 'status':
+        print_status(conn)
+    else:
+        command_retry_failed(args, conn)
+
+
+if __name__ == "__main__":
+    main()
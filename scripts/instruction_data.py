@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+instruction.json の読み取り規則（データ用スクリプト共通）
+
+作業ステップの数え方・切削条件の形式の違いなど、各スクリプトで同じ
+結果にならなければいけない規則をまとめる。アプリ側の同じ規則
+（src/lib/machineTypeUtils.ts の MACHINE_TYPE_KEYS、チャットの作業ステップ数）
+と揃えること。
+"""
+
+MACHINE_TYPES = ['machining', 'turning', 'yokonaka', 'radial', 'other']
+
+
+def iter_work_steps(instruction):
+    """(機械種別, ステップ) を返す
+
+    workStepsByMachine のステップを機械種別の順に返す。workStepsByMachine に
+    ステップが1件も無い場合のみ旧形式の workSteps を使う（機械種別は None）。
+    両方ある図番の workSteps は workStepsByMachine の重複コピーなので数えない。
+    """
+    by_machine = instruction.get('workStepsByMachine') or {}
+    found = False
+    for machine_type in MACHINE_TYPES:
+        for step in by_machine.get(machine_type) or []:
+            found = True
+            yield machine_type, step
+    if not found:
+        for step in instruction.get('workSteps') or []:
+            yield None, step
+
+
+def iter_cutting_conditions(step):
+    """ステップの切削条件を1件ずつ返す
+
+    cuttingConditions は {名前: 条件} の形式と、条件1件を直接書いた旧形式
+    （{'tool': ..., 'spindleSpeed': ...}）がある。
+    """
+    conditions = step.get('cuttingConditions') or {}
+    if 'tool' in conditions:
+        conditions = {'condition': conditions}
+    for condition in conditions.values():
+        if isinstance(condition, dict):
+            yield condition
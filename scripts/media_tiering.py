@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+動画ファイルの階層化（高速領域 → 二次ストレージ）スクリプト
+
+図番フォルダの videos/ と contributions/files/videos/ にある動画のうち、
+一定期間アクセスのないもの（コールド）を二次ストレージのルートへ移動する。
+最終アクセス日時は次のうち最も新しいものを使う。
+    - 監査ログ（audit-YYYY-MM.jsonl）でそのファイル名が記録された日時
+    - ファイルの atime / mtime
+
+移動したファイルはデータルートの media-tiers.json（マニフェスト）に記録する。
+/api/files はマニフェストを見て二次ストレージから配信し、同時に高速領域へ
+書き戻す（src/lib/mediaTier.ts）。書き戻されたファイルは、次にこのスクリプトを
+実行したときにマニフェストから外し、二次ストレージ側のコピーを削除する。
+
+使い方:
+    python scripts/media_tiering.py report
+    python scripts/media_tiering.py demote --cold-root /mnt/archive/data --days 90 --dry-run
+    python scripts/media_tiering.py promote DEMO-001
+    python scripts/media_tiering.py promote --all
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path, PurePosixPath
+
+from drawing_paths import DrawingResolver, get_data_root
+
+MANIFEST_NAME = 'media-tiers.json'
+MANIFEST_VERSION = 1
+
+# 階層化の対象（図番フォルダからの相対パス）
+TIER_DIRS = ('videos', 'contributions/files/videos')
+VIDEO_EXTENSIONS = {'.mp4', '.webm', '.avi', '.mov', '.wmv', '.m4v'}
+
+# マニフェストを保存する間隔（この件数を移動するごとに保存してから元ファイルを消す）
+SAVE_EVERY = 50
+
+
+def get_audit_dir(data_root):
+    """src/lib/auditLogger.ts の getAuditLogDir に準拠（未設定ならデータルートの audit）"""
+    audit_dir = os.environ.get('AUDIT_LOG_DIR', '').strip()
+    return Path(audit_dir) if audit_dir else Path(data_root) / 'audit'
+
+
+def load_manifest(data_root):
+    manifest_path = Path(data_root) / MANIFEST_NAME
+    if not manifest_path.exists():
+        return {'version': MANIFEST_VERSION, 'coldRoot': None, 'files': {}}
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(data_root, manifest):
+    manifest_path = Path(data_root) / MANIFEST_NAME
+    temp_path = manifest_path.with_suffix('.json.tmp')
+    manifest['files'] = dict(sorted(manifest['files'].items()))
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, manifest_path)
+
+
+def parse_timestamp(value):
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+
+
+def load_audit_access_times(audit_dir):
+    """{(図番, ファイル名): 最終記録日時} を監査ログから集める"""
+    access = {}
+    if not audit_dir.exists():
+        return access
+
+    for log_file in sorted(audit_dir.glob('audit-*.jsonl')):
+        with open(log_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                timestamp = parse_timestamp(event.get('timestamp'))
+                if timestamp is None:
+                    continue
+
+                metadata = event.get('metadata') or {}
+                target = str(event.get('target') or '')
+                drawing = metadata.get('drawingNumber') or target.split(':', 1)[0]
+                names = []
+                if metadata.get('fileName'):
+                    names.append(metadata['fileName'])
+                names += [n for n in metadata.get('fileNames') or [] if isinstance(n, str)]
+                if ':' in target:
+                    names.append(target.split(':', 1)[1])
+
+                for name in names:
+                    key = (drawing, PurePosixPath(name).name)
+                    if key not in access or access[key] < timestamp:
+                        access[key] = timestamp
+    return access
+
+
+def iter_drawings(data_root):
+    """(図番, 図番フォルダ, 会社ID) を返す"""
+    resolver = DrawingResolver(data_root)
+    for relative, instruction_file in resolver.iter_instruction_files():
+        try:
+            with open(instruction_file, 'r', encoding='utf-8') as f:
+                metadata = json.load(f).get('metadata') or {}
+        except (OSError, ValueError):
+            metadata = {}
+        drawing = metadata.get('drawingNumber') or PurePosixPath(relative).name.replace('drawing-', '', 1)
+        yield drawing, instruction_file.parent, metadata.get('companyId') or 'unknown'
+
+
+def iter_hot_media(drawing_dir):
+    for tier_dir in TIER_DIRS:
+        base = drawing_dir.joinpath(*tier_dir.split('/'))
+        if not base.exists():
+            continue
+        for path in sorted(base.rglob('*')):
+            if path.is_file() and path.suffix.lower() in VIDEO_EXTENSIONS:
+                yield path
+
+
+def manifest_key(data_root, path):
+    return Path(path).relative_to(data_root).as_posix()
+
+
+def cold_path(cold_root, key):
+    return Path(cold_root).joinpath(*key.split('/'))
+
+
+def copy_file(source, target):
+    """一時ファイルにコピーしてから置き換える（途中で止まっても壊れたファイルを残さない）"""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = target.with_name(f".{target.name}.tmp")
+    shutil.copy2(source, temp_path)
+    if temp_path.stat().st_size != source.stat().st_size:
+        temp_path.unlink()
+        raise OSError(f"コピー後のサイズが一致しません: {source}")
+    os.replace(temp_path, target)
+
+
+def reconcile(data_root, manifest):
+    """アプリが書き戻したファイルをマニフェストから外し、二次ストレージ側を削除する"""
+    promoted = 0
+    for key in list(manifest['files']):
+        hot = Path(data_root).joinpath(*key.split('/'))
+        if not hot.exists():
+            continue
+        # 書き戻し後に管理画面で同名ファイルが上書きされていても高速領域側を正とする
+        cold = cold_path(manifest['coldRoot'], key)
+        if cold.exists():
+            cold.unlink()
+        del manifest['files'][key]
+        promoted += 1
+    if promoted:
+        save_manifest(data_root, manifest)
+        print(f"🔄 アプリ側で書き戻された {promoted}件をマニフェストから外しました")
+
+
+def format_bytes(size):
+    return f"{size / (1024 * 1024):,.1f} MB"
+
+
+def command_report(args, manifest):
+    hot = defaultdict(lambda: [0, 0])
+    cold = defaultdict(lambda: [0, 0])
+
+    for _, drawing_dir, company_id in iter_drawings(args.data_root):
+        for path in iter_hot_media(drawing_dir):
+            hot[company_id][0] += 1
+            hot[company_id][1] += path.stat().st_size
+    for entry in manifest['files'].values():
+        cold[entry.get('companyId', 'unknown')][0] += 1
+        cold[entry.get('companyId', 'unknown')][1] += entry['size']
+
+    print(f"📊 動画の配置状況（二次ストレージ: {manifest['coldRoot'] or '未設定'}）")
+    print("=" * 72)
+    print(f"{'会社ID':<28}{'高速領域':>22}{'二次ストレージ':>22}")
+    for company_id in sorted(set(hot) | set(cold)):
+        h, c = hot[company_id], cold[company_id]
+        print(f"{company_id:<28}{format_bytes(h[1]):>14} ({h[0]:>4}件){format_bytes(c[1]):>14} ({c[0]:>4}件)")
+    print("=" * 72)
+    total_hot = sum(v[1] for v in hot.values())
+    total_cold = sum(v[1] for v in cold.values())
+    print(f"{'合計':<26}{format_bytes(total_hot):>22}{format_bytes(total_cold):>22}")
+
+
+def command_demote(args, manifest):
+    cold_root = args.cold_root or manifest['coldRoot']
+    if not cold_root:
+        print("❌ --cold-root（または環境変数 MEDIA_COLD_ROOT）を指定してください")
+        sys.exit(1)
+    cold_root = str(Path(cold_root).resolve())
+    if manifest['coldRoot'] and manifest['coldRoot'] != cold_root and manifest['files']:
+        print(f"❌ 既に別の二次ストレージに移動済みのファイルがあります: {manifest['coldRoot']}")
+        sys.exit(1)
+    manifest['coldRoot'] = cold_root
+
+    now = datetime.now(timezone.utc)
+    threshold = now - timedelta(days=args.days)
+    audit_access = load_audit_access_times(get_audit_dir(args.data_root))
+
+    candidates = []
+    for drawing, drawing_dir, company_id in iter_drawings(args.data_root):
+        for path in iter_hot_media(drawing_dir):
+            stat = path.stat()
+            last_access = max(
+                datetime.fromtimestamp(max(stat.st_atime, stat.st_mtime), timezone.utc),
+                audit_access.get((drawing, path.name), datetime.min.replace(tzinfo=timezone.utc)),
+            )
+            if last_access < threshold:
+                candidates.append((path, company_id, last_access, stat.st_size))
+
+    print(f"{'[DRY RUN] ' if args.dry_run else ''}{args.days}日以上アクセスのない動画: "
+          f"{len(candidates)}件 ({format_bytes(sum(c[3] for c in candidates))})")
+    print("=" * 60)
+
+    moved = []
+    errors = 0
+
+    def flush():
+        # マニフェストに記録してから高速領域のファイルを消す
+        save_manifest(args.data_root, manifest)
+        for path in moved:
+            path.unlink()
+        moved.clear()
+
+    try:
+        for path, company_id, last_access, size in candidates:
+            key = manifest_key(args.data_root, path)
+            print(f"  {key} (最終アクセス {last_access:%Y-%m-%d}, {format_bytes(size)})")
+            if args.dry_run:
+                continue
+            try:
+                copy_file(path, cold_path(cold_root, key))
+            except OSError as e:
+                print(f"  ❌ {e}")
+                errors += 1
+                continue
+            manifest['files'][key] = {
+                'size': size,
+                'companyId': company_id,
+                'lastAccess': last_access.isoformat(),
+                'movedAt': now.isoformat(),
+            }
+            moved.append(path)
+            if len(moved) >= SAVE_EVERY:
+                flush()
+    finally:
+        if not args.dry_run:
+            flush()
+
+    print("=" * 60)
+    print(f"移動: {0 if args.dry_run else len(candidates) - errors}件, エラー: {errors}件")
+    if errors:
+        sys.exit(1)
+
+
+def command_promote(args, manifest):
+    if not args.all and not args.drawings:
+        print("❌ 図番または --all を指定してください")
+        sys.exit(1)
+
+    prefixes = None
+    if not args.all:
+        resolver = DrawingResolver(args.data_root)
+        prefixes = tuple(
+            manifest_key(args.data_root, resolver.resolve(d)) + '/' for d in args.drawings
+        )
+
+    restored = errors = 0
+    for key, entry in list(manifest['files'].items()):
+        if prefixes and not key.startswith(prefixes):
+            continue
+        source = cold_path(manifest['coldRoot'], key)
+        target = Path(args.data_root).joinpath(*key.split('/'))
+        try:
+            copy_file(source, target)
+        except OSError as e:
+            print(f"  ❌ {key}: {e}")
+            errors += 1
+            continue
+        del manifest['files'][key]
+        save_manifest(args.data_root, manifest)
+        source.unlink()
+        restored += 1
+        print(f"  ✅ {key}")
+
+    print(f"\n書き戻し: {restored}件, エラー: {errors}件")
+    if errors:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='動画ファイルの高速領域 / 二次ストレージ階層化')
+    parser.add_argument('--data-root', type=Path, default=Path(get_data_root()))
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('report', help='会社ごとの高速領域・二次ストレージ使用量')
+
+    demote = subparsers.add_parser('demote', help='アクセスのない動画を二次ストレージへ移動')
+    demote.add_argument('--cold-root', default=os.environ.get('MEDIA_COLD_ROOT'))
+    demote.add_argument('--days', type=int, default=90, help='この日数アクセスがなければ移動する')
+    demote.add_argument('--dry-run', action='store_true')
+
+    promote = subparsers.add_parser('promote', help='二次ストレージの動画を高速領域へ戻す')
+    promote.add_argument('drawings', nargs='*', help='図番')
+    promote.add_argument('--all', action='store_true')
+
+    args = parser.parse_args()
+
+    manifest = load_manifest(args.data_root)
+    if manifest['files']:
+        reconcile(args.data_root, manifest)
+
+    if args.command == 'report':
+        command_report(args, manifest)
+    elif args.command == 'demote':
+        command_demote(args, manifest)
+    else:
+        command_promote(args, manifest)
+
+
+if __name__ == "__main__":
+    main()
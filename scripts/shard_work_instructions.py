@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+work-instructions のシャード配置への移行・索引作成スクリプト
+
+図番フォルダを会社ID別またはハッシュ先頭2桁別のサブフォルダへ移動し、
+図番 → 相対パスの索引（drawing-paths.json）を作成する。--layout flat で
+従来の配置に戻せる。移動は1フォルダずつ行い、途中で止まっても索引は
+その時点の配置で保存されるので、再実行すれば続きから移行できる。
+
+図番フォルダのパスを記録している生成物は、移動に合わせて参照先を書き換える。
+    chat-digests.json             キー（図番フォルダの相対パス）
+    search-tfidf/meta.json        docs[].folderPath
+    .compaction-journal.jsonl     drawing（図番フォルダの相対パス）
+    media-tiers.json              キー（二次ストレージ側のファイルも移動する）
+.validation-cache.json は絶対パスがキーなので書き換えない（移動した図番は
+次回の検証で再検証される）。
+
+使い方:
+    python scripts/shard_work_instructions.py --layout hash --dry-run
+    python scripts/shard_work_instructions.py --layout company
+    python scripts/shard_work_instructions.py --layout flat
+    python scripts/shard_work_instructions.py --reindex      # 移動せず索引だけ作り直す
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path, PurePosixPath
+
+from compact_work_steps import JOURNAL_NAME
+from drawing_paths import (
+    LAYOUTS, get_data_root, load_index, save_index, scan_drawing_dirs, shard_path,
+)
+from media_tiering import cold_path, load_manifest, save_manifest
+
+# 図番フォルダの相対パスを持つ生成物（build_chat_digests.py / build_tfidf_index.py が作成）
+DIGESTS_NAME = 'chat-digests.json'
+TFIDF_META = 'search-tfidf/meta.json'
+
+
+def load_company_map(data_root):
+    """図番 → 会社ID（companies.json、無ければ search-index.json から）"""
+    company_map = {}
+    index_path = data_root / 'search-index.json'
+    if index_path.exists():
+        with open(index_path, 'r', encoding='utf-8') as f:
+            for drawing in json.load(f).get('drawings', []):
+                company_map[drawing['drawingNumber']] = drawing.get('companyId')
+    companies_path = data_root / 'companies.json'
+    if companies_path.exists():
+        with open(companies_path, 'r', encoding='utf-8') as f:
+            for company in json.load(f).get('companies', []):
+                for product in company.get('products', []):
+                    for drawing in product.get('drawings', []):
+                        company_map[drawing] = company['id']
+    return company_map
+
+
+def write_json(path, data):
+    temp_path = path.with_name(f"{path.name}.tmp")
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temp_path, path)
+
+
+def tier_prefix(relative):
+    return f"work-instructions/{relative}/"
+
+
+def move_cold_files(tiers, relative, target):
+    """移動した図番の media-tiers.json のキーと二次ストレージ側のファイルを移す"""
+    old_prefix, new_prefix = tier_prefix(relative), tier_prefix(target)
+    for key in [k for k in tiers['files'] if k.startswith(old_prefix)]:
+        new_key = new_prefix + key[len(old_prefix):]
+        source = cold_path(tiers['coldRoot'], key)
+        if source.exists():
+            destination = cold_path(tiers['coldRoot'], new_key)
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(source, destination)
+        tiers['files'][new_key] = tiers['files'].pop(key)
+
+
+def remap_artifacts(data_root, renames):
+    """図番フォルダの相対パスを記録している生成物を移動後のパスに書き換える
+
+    renames は {移動前の相対パス: 移動後の相対パス}。更新したファイル名を返す。
+    """
+    updated = []
+
+    digests_path = data_root / DIGESTS_NAME
+    if digests_path.exists():
+        with open(digests_path, 'r', encoding='utf-8') as f:
+            digests = json.load(f)
+        digests['digests'] = {
+            renames.get(relative, relative): entry for relative, entry in digests.get('digests', {}).items()
+        }
+        write_json(digests_path, digests)
+        updated.append(DIGESTS_NAME)
+
+    meta_path = data_root / TFIDF_META
+    if meta_path.exists():
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        for doc in meta.get('docs', []):
+            doc['folderPath'] = renames.get(doc['folderPath'], doc['folderPath'])
+        write_json(meta_path, meta)
+        updated.append(TFIDF_META)
+
+    journal_path = data_root / JOURNAL_NAME
+    if journal_path.exists():
+        lines = []
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    entry['drawing'] = renames.get(entry['drawing'], entry['drawing'])
+                    lines.append(json.dumps(entry, ensure_ascii=False) + '\n')
+        temp_path = journal_path.with_name(f"{journal_path.name}.tmp")
+        temp_path.write_text(''.join(lines), encoding='utf-8')
+        os.replace(temp_path, journal_path)
+        updated.append(JOURNAL_NAME)
+
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description='work-instructions のシャード配置への移行')
+    parser.add_argument('--data-root', type=Path, default=Path(get_data_root()))
+    parser.add_argument('--layout', choices=LAYOUTS)
+    parser.add_argument('--reindex', action='store_true', help='移動せず現在の配置で索引を作り直す')
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    if not args.layout and not args.reindex:
+        parser.error('--layout または --reindex を指定してください')
+
+    base_path = args.data_root / 'work-instructions'
+    current = scan_drawing_dirs(args.data_root)
+    previous = load_index(args.data_root)
+
+    if args.reindex:
+        layout = args.layout or (previous or {}).get('layout', 'flat')
+        save_index(args.data_root, layout, current)
+        print(f"DONE: {len(current)} drawings indexed (layout: {layout})")
+        return
+
+    company_map = load_company_map(args.data_root) if args.layout == 'company' else {}
+    tiers = load_manifest(args.data_root)
+    cold_root_available = bool(tiers['coldRoot']) and Path(tiers['coldRoot']).exists()
+    paths = dict(current)
+    renames = {}
+    tiers_changed = False
+    errors = 0
+
+    print(f"{'[DRY RUN] ' if args.dry_run else ''}Migrating {len(current)} drawings to '{args.layout}' layout...")
+    print("=" * 60)
+
+    try:
+        for drawing, relative in sorted(current.items()):
+            target = shard_path(args.layout, drawing, company_map.get(drawing))
+            if target == relative:
+                continue
+
+            source_dir = base_path.joinpath(*PurePosixPath(relative).parts)
+            target_dir = base_path.joinpath(*PurePosixPath(target).parts)
+            if target_dir.exists():
+                print(f"ERROR {drawing}: {target} already exists")
+                errors += 1
+                continue
+            has_cold_files = any(key.startswith(tier_prefix(relative)) for key in tiers['files'])
+            if has_cold_files and not cold_root_available:
+                # 二次ストレージ側も同じパスへ移さないと配信できなくなる
+                print(f"ERROR {drawing}: cold storage not available ({tiers['coldRoot']})")
+                errors += 1
+                continue
+
+            print(f"  {relative} -> {target}")
+            if args.dry_run:
+                continue
+
+            target_dir.parent.mkdir(parents=True, exist_ok=True)
+            source_dir.rename(target_dir)
+            paths[drawing] = target
+            renames[relative] = target
+            if has_cold_files:
+                move_cold_files(tiers, relative, target)
+                tiers_changed = True
+
+            # 空になったシャードフォルダを削除
+            if source_dir.parent != base_path and not any(source_dir.parent.iterdir()):
+                source_dir.parent.rmdir()
+    finally:
+        if not args.dry_run:
+            save_index(args.data_root, args.layout, paths)
+            if tiers_changed:
+                save_manifest(args.data_root, tiers)
+                print("Updated paths in media-tiers.json")
+            if renames:
+                for name in remap_artifacts(args.data_root, renames):
+                    print(f"Updated paths in {name}")
+
+    print("\n" + "=" * 60)
+    print(f"Moved: {len(renames)}, errors: {errors}")
+    if not args.dry_run:
+        print(f"Index saved: {args.data_root / 'drawing-paths.json'}")
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+類似図番（relatedDrawings 候補）提案スクリプト
+
+各図番の作業ステップ・工具・切削条件から特徴集合を作り、MinHash で
+シグネチャ化する。LSH バンディングで同じバケットに入った図番の組だけを
+比較するため、全組み合わせ（O(n²)）を比較せずに類似候補を見つけられる。
+バンド数・行数は --threshold から決め、しきい値ちょうどの組も
+MIN_RECALL 以上の確率で候補に入るようにする。
+
+シグネチャは図番ごとにキャッシュ（.minhash-cache.json）し、instruction.json が
+変わった図番だけを再計算する。結果はデータルートの related-suggestions.json に
+図番ごとの類似度順で出力する（既に relatedDrawings にある図番は除外）。
+作業ステップ等がほとんど無い図番（MIN_FEATURES 未満）は比較対象から外す。
+
+使い方:
+    python scripts/suggest_related_drawings.py
+    python scripts/suggest_related_drawings.py --threshold 0.4 --top 5
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from itertools import combinations
+from pathlib import Path
+
+from drawing_paths import DrawingResolver, get_data_root
+from instruction_data import iter_cutting_conditions, iter_work_steps
+
+NUM_PERM = 128
+MIN_RECALL = 0.9
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+SHINGLE_SIZE = 3
+# 特徴の抽出規則を変えたら上げる（キャッシュ済みのシグネチャを作り直す）
+FEATURE_VERSION = 3
+# 作業ステップ・工具・切削条件の特徴がこれ未満の図番は比較しない
+# （空の図番どうしは特徴集合が同じになり、類似度 1.0 と推定されてしまうため）
+MIN_FEATURES = 5
+
+CACHE_NAME = '.minhash-cache.json'
+OUTPUT_NAME = 'related-suggestions.json'
+
+# 乱数シードを固定し、実行ごとに同じハッシュ関数群を使う（キャッシュの前提）
+_rng = random.Random(20260215)
+PERMUTATIONS = [
+    (_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+]
+PERMUTATION_KEY = hashlib.sha256(repr((PERMUTATIONS, SHINGLE_SIZE, FEATURE_VERSION)).encode()).hexdigest()
+
+
+def normalize_text(text):
+    return re.sub(r'\s+', '', str(text)).lower()
+
+
+def extract_features(data):
+    """instruction.json から比較用の特徴集合（文字列の集合）を作る"""
+    features = set()
+
+    for tool in (data.get('metadata') or {}).get('toolsRequired') or []:
+        features.add(f"tool:{normalize_text(tool)}")
+    for machine_type in (data.get('metadata') or {}).get('machineType') or []:
+        features.add(f"machine:{machine_type}")
+
+    for machine_type, step in iter_work_steps(data):
+        if machine_type:
+            features.add(f"machine:{machine_type}")
+
+        # 手順文は文字 n-gram（日本語は単語区切りがないため）
+        text = ''.join([
+            step.get('title', ''),
+            step.get('description', ''),
+            *(step.get('detailedInstructions') or []),
+        ])
+        text = normalize_text(text)
+        for i in range(len(text) - SHINGLE_SIZE + 1):
+            features.add(f"text:{text[i:i + SHINGLE_SIZE]}")
+
+        for tool in step.get('tools') or []:
+            features.add(f"tool:{normalize_text(tool)}")
+
+        for condition in iter_cutting_conditions(step):
+            for key in ('tool', 'spindleSpeed', 'feedRate', 'depthOfCut'):
+                value = normalize_text(condition.get(key, ''))
+                if value:
+                    features.add(f"cut:{key}:{value}")
+
+    return features
+
+
+def has_enough_features(features):
+    """機械種別以外（手順文・工具・切削条件）の特徴が MIN_FEATURES 件以上あるか"""
+    return sum(1 for f in features if not f.startswith('machine:')) >= MIN_FEATURES
+
+
+def minhash(features):
+    """特徴集合の MinHash シグネチャ（NUM_PERM 個の 32bit 値）"""
+    if not features:
+        return [MAX_HASH] * NUM_PERM
+    base = [
+        int.from_bytes(hashlib.blake2b(f.encode('utf-8'), digest_size=8).digest(), 'little')
+        for f in features
+    ]
+    return [
+        min(((a * x + b) % MERSENNE_PRIME) & MAX_HASH for x in base)
+        for a, b in PERMUTATIONS
+    ]
+
+
+def estimate_similarity(sig_a, sig_b):
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / NUM_PERM
+
+
+def choose_banding(threshold):
+    """類似度がしきい値ちょうどの組が候補になる確率（1 - (1 - s^r)^b）が
+    MIN_RECALL 以上になる中で、行数 r が最大（候補ペアが最少）の (バンド数, 行数)"""
+    for rows in range(NUM_PERM, 0, -1):
+        bands = NUM_PERM // rows
+        if 1 - (1 - threshold ** rows) ** bands >= MIN_RECALL:
+            return bands, rows
+    return NUM_PERM, 1
+
+
+def load_cache(cache_path):
+    if not cache_path.exists():
+        return {}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('permutationKey') != PERMUTATION_KEY:
+        return {}
+    return cache.get('drawings', {})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='MinHash/LSH による類似図番の提案')
+    parser.add_argument('--data-root', type=Path, default=Path(get_data_root()))
+    parser.add_argument('--threshold', type=float, default=0.5, help='提案する最小類似度（推定 Jaccard）')
+    parser.add_argument('--top', type=int, default=10, help='図番ごとの最大提案数')
+    args = parser.parse_args()
+    if not 0 < args.threshold <= 1:
+        parser.error('--threshold は 0 より大きく 1 以下で指定してください')
+    bands, rows = choose_banding(args.threshold)
+
+    cache_path = args.data_root / CACHE_NAME
+    cache = load_cache(cache_path)
+
+    print("🔍 類似図番の検出を開始...")
+    started = time.monotonic()
+
+    signatures = {}
+    existing_relations = {}
+    cached_drawings = set()
+    updated = 0
+    skipped = 0
+
+    for _, instruction_file in DrawingResolver(args.data_root).iter_instruction_files():
+        raw = instruction_file.read_bytes()
+        source_hash = hashlib.sha256(raw).hexdigest()
+        data = json.loads(raw)
+        drawing = (data.get('metadata') or {}).get('drawingNumber') \
+            or instruction_file.parent.name.replace('drawing-', '', 1)
+
+        existing_relations[drawing] = {
+            r.get('drawingNumber') for r in data.get('relatedDrawings') or []
+        }
+
+        cached_drawings.add(drawing)
+        cached = cache.get(drawing)
+        if cached and cached['sourceHash'] == source_hash:
+            signature = cached['signature']
+        else:
+            features = extract_features(data)
+            # 特徴が少ない図番はシグネチャを None として記録する
+            signature = minhash(features) if has_enough_features(features) else None
+            cache[drawing] = {'sourceHash': source_hash, 'signature': signature}
+            updated += 1
+
+        if signature is None:
+            skipped += 1
+        else:
+            signatures[drawing] = signature
+
+    # 削除された図番をキャッシュから除く
+    cache = {d: v for d, v in cache.items() if d in cached_drawings}
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump({'permutationKey': PERMUTATION_KEY, 'drawings': cache}, f)
+
+    print(f"  📊 図番数: {len(signatures)}（シグネチャ再計算 {updated}件）")
+    if skipped:
+        print(f"  ⏭️ 作業ステップ等の特徴が少ないため比較しない図番: {skipped}件")
+    print(f"  🧮 LSH: {bands}バンド × {rows}行（しきい値 {args.threshold}）")
+
+    # LSH: バンドごとにバケット分けし、同じバケットの組だけを候補にする
+    buckets = defaultdict(list)
+    for drawing, signature in signatures.items():
+        for band in range(bands):
+            key = (band, tuple(signature[band * rows:(band + 1) * rows]))
+            buckets[key].append(drawing)
+
+    candidates = set()
+    for members in buckets.values():
+        if len(members) > 1:
+            candidates.update(combinations(sorted(members), 2))
+
+    suggestions = defaultdict(list)
+    for a, b in candidates:
+        score = estimate_similarity(signatures[a], signatures[b])
+        if score < args.threshold:
+            continue
+        if b not in existing_relations.get(a, set()):
+            suggestions[a].append({'drawingNumber': b, 'similarity': round(score, 3)})
+        if a not in existing_relations.get(b, set()):
+            suggestions[b].append({'drawingNumber': a, 'similarity': round(score, 3)})
+
+    result = {
+        drawing: sorted(items, key=lambda s: (-s['similarity'], s['drawingNumber']))[:args.top]
+        for drawing, items in sorted(suggestions.items())
+    }
+
+    output_path = args.data_root / OUTPUT_NAME
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'suggestions': result,
+            'metadata': {
+                'generatedAt': datetime.now(timezone.utc).isoformat(),
+                'threshold': args.threshold,
+                'numPerm': NUM_PERM,
+                'bands': bands,
+                'rows': rows,
+                'minFeatures': MIN_FEATURES,
+                'skippedDrawings': skipped,
+                'candidatePairs': len(candidates),
+            },
+        }, f, ensure_ascii=False, indent=2)
+
+    elapsed = time.monotonic() - started
+    print(f"  📊 候補ペア: {len(candidates)}件 / 提案あり図番: {len(result)}件")
+    for drawing, items in result.items():
+        listed = ', '.join(f"{s['drawingNumber']}({s['similarity']:.2f})" for s in items)
+        print(f"  🔗 {drawing}: {listed}")
+    print(f"💾 保存しました: {output_path}（{elapsed:.2f}秒）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+compact_work_steps.py の compact_instruction の確認
+
+workSteps を削除する破壊的な変換なので、削除してよい場合・いけない場合と
+メディア参照の移し替えを確認する。
+
+使い方:
+    python scripts/test_compact_work_steps.py
+"""
+
+import copy
+import unittest
+
+from compact_work_steps import compact_instruction
+
+
+def make_step(number, title, **extra):
+    return {'stepNumber': number, 'title': title, 'description': f"{title}の説明", **extra}
+
+
+class CompactInstructionTest(unittest.TestCase):
+
+    def test_fully_covered_drawing_drops_work_steps(self):
+        data = {
+            'workSteps': [make_step(1, '荒加工'), make_step(2, '仕上げ')],
+            'workStepsByMachine': {
+                'machining': [make_step(1, '荒加工')],
+                'turning': [make_step(2, '仕上げ')],
+            },
+        }
+        expected_by_machine = copy.deepcopy(data['workStepsByMachine'])
+
+        data, removed = compact_instruction(data)
+
+        self.assertTrue(removed)
+        self.assertNotIn('workSteps', data)
+        self.assertEqual(data['workStepsByMachine'], expected_by_machine)
+
+    def test_partially_covered_drawing_is_left_unchanged(self):
+        data = {
+            'workSteps': [make_step(1, '荒加工'), make_step(2, '仕上げ')],
+            'workStepsByMachine': {
+                'machining': [make_step(1, '荒加工'), make_step(2, '仕上げ（変更後）')],
+            },
+        }
+        original = copy.deepcopy(data)
+
+        data, removed = compact_instruction(data)
+
+        self.assertFalse(removed)
+        self.assertEqual(data, original)
+
+    def test_media_only_in_work_steps_is_moved(self):
+        data = {
+            'workSteps': [make_step(1, '荒加工', images=['a.jpg'], videos=['a.mp4'])],
+            'workStepsByMachine': {'machining': [make_step(1, '荒加工')]},
+        }
+
+        data, removed = compact_instruction(data)
+
+        self.assertTrue(removed)
+        step = data['workStepsByMachine']['machining'][0]
+        self.assertEqual(step['images'], ['a.jpg'])
+        self.assertEqual(step['videos'], ['a.mp4'])
+
+    def test_differing_media_is_merged_without_duplicates(self):
+        data = {
+            'workSteps': [make_step(1, '荒加工', images=['a.jpg', 'b.jpg'], videos=['old.mp4'])],
+            'workStepsByMachine': {
+                'machining': [make_step(1, '荒加工', images=['b.jpg', 'c.jpg'], videos=['new.mp4'])],
+            },
+        }
+
+        data, removed = compact_instruction(data)
+
+        self.assertTrue(removed)
+        step = data['workStepsByMachine']['machining'][0]
+        self.assertEqual(step['images'], ['b.jpg', 'c.jpg', 'a.jpg'])
+        self.assertEqual(step['videos'], ['new.mp4', 'old.mp4'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+instruction.json スキーマ検証スクリプト
+
+scripts/schemas/instruction.schema.json（JSON Schema draft-07 のサブセット）を
+一度だけ検証関数にコンパイルし、work-instructions 配下の全 instruction.json を
+複数プロセスで並列に検証する。エラーは JSON Pointer（例: /workSteps/0/stepNumber）
+付きで出力する。
+
+前回検証時から変更のないファイルはキャッシュ（.validation-cache.json）で
+スキップする。スキーマが変わった場合はキャッシュ全体を破棄する。
+
+使い方:
+    python scripts/validate_instructions.py
+    python scripts/validate_instructions.py --full        # キャッシュを使わず全件検証
+    python scripts/validate_instructions.py --data-root ./public/data_demo -j 4
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from drawing_paths import DrawingResolver, get_data_root
+
+SCHEMA_PATH = Path(__file__).parent / 'schemas' / 'instruction.schema.json'
+CACHE_NAME = '.validation-cache.json'
+
+TYPE_CHECKS = {
+    'object': lambda v: isinstance(v, dict),
+    'array': lambda v: isinstance(v, list),
+    'string': lambda v: isinstance(v, str),
+    'integer': lambda v: isinstance(v, int) and not isinstance(v, bool),
+    'number': lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    'boolean': lambda v: isinstance(v, bool),
+    'null': lambda v: v is None,
+}
+
+
+def pointer_token(key):
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+
+def compile_schema(schema):
+    """スキーマを検証関数 validate(value, pointer, errors) にコンパイルする
+
+    $ref は定義ごとに一度だけコンパイルし、以降は同じ関数を共有する。
+    """
+    compiled_refs = {}
+
+    def resolve_ref(ref):
+        if ref in compiled_refs:
+            return compiled_refs[ref]
+        if not ref.startswith('#/'):
+            raise ValueError(f"未対応の $ref です: {ref}")
+        node = schema
+        for part in ref[2:].split('/'):
+            node = node[part.replace('~1', '/').replace('~0', '~')]
+
+        # 再帰参照に備えて先に枠を登録してから中身をコンパイルする
+        slot = []
+        compiled_refs[ref] = lambda value, pointer, errors: slot[0](value, pointer, errors)
+        slot.append(compile_node(node))
+        return compiled_refs[ref]
+
+    def compile_node(node):
+        if '$ref' in node:
+            return resolve_ref(node['$ref'])
+
+        checks = []
+
+        if 'type' in node:
+            types = node['type'] if isinstance(node['type'], list) else [node['type']]
+            type_fns = [TYPE_CHECKS[t] for t in types]
+            expected = ' | '.join(types)
+
+            def check_type(value, pointer, errors):
+                if not any(fn(value) for fn in type_fns):
+                    errors.append((pointer, f"型が不正です（期待: {expected}, 実際: {type(value).__name__}）"))
+                    return False
+                return True
+            checks.append(check_type)
+
+        if 'enum' in node:
+            allowed = node['enum']
+
+            def check_enum(value, pointer, errors):
+                if value not in allowed:
+                    errors.append((pointer, f"許可されていない値です: {value!r}（許可: {allowed}）"))
+                    return False
+                return True
+            checks.append(check_enum)
+
+        if 'minLength' in node or 'pattern' in node:
+            min_length = node.get('minLength', 0)
+            pattern = re.compile(node['pattern']) if 'pattern' in node else None
+
+            def check_string(value, pointer, errors):
+                if not isinstance(value, str):
+                    return True
+                if len(value) < min_length:
+                    errors.append((pointer, f"文字数が不足しています（最小: {min_length}）"))
+                if pattern and not pattern.search(value):
+                    errors.append((pointer, f"形式が不正です: {value!r}（パターン: {pattern.pattern}）"))
+                return True
+            checks.append(check_string)
+
+        if 'minimum' in node:
+            minimum = node['minimum']
+
+            def check_minimum(value, pointer, errors):
+                if isinstance(value, (int, float)) and not isinstance(value, bool) and value < minimum:
+                    errors.append((pointer, f"値が小さすぎます: {value}（最小: {minimum}）"))
+                return True
+            checks.append(check_minimum)
+
+        if 'required' in node or 'properties' in node or 'additionalProperties' in node:
+            required = node.get('required', [])
+            properties = {k: compile_node(v) for k, v in node.get('properties', {}).items()}
+            additional = node.get('additionalProperties', True)
+            additional_fn = compile_node(additional) if isinstance(additional, dict) else None
+
+            def check_object(value, pointer, errors):
+                if not isinstance(value, dict):
+                    return True
+                for key in required:
+                    if key not in value:
+                        errors.append((f"{pointer}/{pointer_token(key)}", "必須項目がありません"))
+                for key, item in value.items():
+                    child = f"{pointer}/{pointer_token(key)}"
+                    if key in properties:
+                        properties[key](item, child, errors)
+                    elif additional is False:
+                        errors.append((child, "定義されていない項目です"))
+                    elif additional_fn:
+                        additional_fn(item, child, errors)
+                return True
+            checks.append(check_object)
+
+        if 'items' in node:
+            item_fn = compile_node(node['items'])
+
+            def check_items(value, pointer, errors):
+                if isinstance(value, list):
+                    for i, item in enumerate(value):
+                        item_fn(item, f"{pointer}/{i}", errors)
+                return True
+            checks.append(check_items)
+
+        if 'anyOf' in node:
+            options = [compile_node(option) for option in node['anyOf']]
+
+            def check_any_of(value, pointer, errors):
+                candidates = []
+                for option in options:
+                    option_errors = []
+                    option(value, pointer, option_errors)
+                    if not option_errors:
+                        return True
+                    candidates.append(option_errors)
+                # 最もエラーの少ない候補を報告する
+                errors.extend(min(candidates, key=len))
+                return False
+            checks.append(check_any_of)
+
+        def validate(value, pointer, errors):
+            for check in checks:
+                # 型・enum が不一致なら以降の詳細チェックは行わない
+                if check(value, pointer, errors) is False:
+                    return
+
+        return validate
+
+    return compile_node(schema)
+
+
+def load_schema():
+    with open(SCHEMA_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+_validator = None
+
+
+def get_validator():
+    """コンパイル済み検証関数を返す（プロセスごとに一度だけコンパイル）"""
+    global _validator
+    if _validator is None:
+        _validator = compile_schema(load_schema())
+    return _validator
+
+
+def validate_instruction(data):
+    """instruction.json の内容を検証し、(JSON Pointer, メッセージ) のリストを返す"""
+    errors = []
+    get_validator()(data, '', errors)
+    return [(pointer or '/', message) for pointer, message in errors]
+
+
+def validate_file(path):
+    """ワーカープロセスで実行: 1ファイルを読み込んで検証"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        return path, [('/', f"JSONとして読み込めません: {e}")]
+    return path, validate_instruction(data)
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def load_cache(cache_path, schema_hash):
+    if not cache_path.exists():
+        return {}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('schemaHash') != schema_hash:
+        return {}
+    return cache.get('files', {})
+
+
+def save_cache(cache_path, schema_hash, files):
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump({'schemaHash': schema_hash, 'files': files}, f, ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='instruction.json のスキーマ検証')
+    parser.add_argument('--data-root', type=Path, default=Path(get_data_root()))
+    parser.add_argument('--full', action='store_true', help='キャッシュを使わず全件検証')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    base_path = args.data_root / 'work-instructions'
+    if not base_path.exists():
+        print(f"❌ フォルダが見つかりません: {base_path}")
+        sys.exit(1)
+
+    schema_hash = hashlib.sha256(SCHEMA_PATH.read_bytes()).hexdigest()
+    cache_path = args.data_root / CACHE_NAME
+    cache = {} if args.full else load_cache(cache_path, schema_hash)
+
+    files = sorted(str(p) for _, p in DrawingResolver(args.data_root).iter_instruction_files())
+    signatures = {path: file_signature(path) for path in files}
+    targets = [path for path in files if cache.get(path) != signatures[path]]
+
+    print(f"🔍 instruction.json 検証: {len(targets)}/{len(files)}件（変更なし {len(files) - len(targets)}件はスキップ）")
+
+    started = time.monotonic()
+    # 検証に合格したファイルだけをキャッシュに残す
+    valid = {path: sig for path, sig in cache.items() if path in signatures and sig == signatures[path]}
+    failed = 0
+
+    if targets:
+        chunksize = max(1, len(targets) // (args.workers * 4))
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for path, errors in pool.map(validate_file, targets, chunksize=chunksize):
+                if errors:
+                    failed += 1
+                    print(f"\n❌ {Path(path).relative_to(args.data_root)}")
+                    for pointer, message in errors:
+                        print(f"  - {pointer}: {message}")
+                else:
+                    valid[path] = signatures[path]
+
+    save_cache(cache_path, schema_hash, valid)
+
+    elapsed = time.monotonic() - started
+    print(f"\n📊 検証結果: 合格 {len(files) - failed}件 / エラー {failed}件（{elapsed:.2f}秒）")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
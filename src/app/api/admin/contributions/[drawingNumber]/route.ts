@@ -2,21 +2,22 @@
 
 import { NextRequest, NextResponse } from 'next/server'
 import { getDataPath } from '@/lib/admin/utils'
+import { resolveDrawingPath } from '@/lib/drawingPaths'
 import path from 'path'
 import fs from 'fs/promises'
 import { ContributionFile, ContributionData } from '@/types/contribution'
 import { logAuditEvent, extractAuditActorFromHeaders } from '@/lib/auditLogger'
 
 // 追記ファイルのパスを取得
-function getContributionFilePath(drawingNumber: string): string {
+async function getContributionFilePath(drawingNumber: string): Promise<string> {
   const dataPath = getDataPath()
-  return path.join(dataPath, 'work-instructions', `drawing-${drawingNumber}`, 'contributions', 'contributions.json')
+  return path.join(await resolveDrawingPath(dataPath, drawingNumber), 'contributions', 'contributions.json')
 }
 
 // 追記データを読み込み
 async function loadContributions(drawingNumber: string): Promise<ContributionFile | null> {
   try {
-    const filePath = getContributionFilePath(drawingNumber)
+    const filePath = await getContributionFilePath(drawingNumber)
     const data = await fs.readFile(filePath, 'utf-8')
     return JSON.parse(data)
   } catch (error) {
@@ -27,7 +28,7 @@ async function loadContributions(drawingNumber: string): Promise<ContributionFil
 
 // 追記データを保存
 async function saveContributions(drawingNumber: string, data: ContributionFile): Promise<void> {
-  const filePath = getContributionFilePath(drawingNumber)
+  const filePath = await getContributionFilePath(drawingNumber)
   await fs.writeFile(filePath, JSON.stringify(data, null, 2), 'utf-8')
 }
 
@@ -38,7 +39,7 @@ async function deleteContributionFiles(drawingNumber: string, contribution: Cont
   }
 
   const dataPath = getDataPath()
-  const contributionsDir = path.join(dataPath, 'work-instructions', `drawing-${drawingNumber}`, 'contributions')
+  const contributionsDir = path.join(await resolveDrawingPath(dataPath, drawingNumber), 'contributions')
 
   for (const file of contribution.content.files) {
     try {
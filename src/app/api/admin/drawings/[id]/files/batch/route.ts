@@ -10,6 +10,7 @@ import {
   createSafeFileName
 } from '@/lib/admin/utils'
 import { logAuditEvent, extractAuditActorFromHeaders } from '@/lib/auditLogger'
+import { resolveDrawingPath } from '@/lib/drawingPaths'
 
 
 // ファイルタイプ判定（共通ユーティリティのラッパー）
@@ -191,9 +192,7 @@ async function updateInstructionFile(
 ): Promise<void> {
   const dataPath = getDataPath()
   const instructionPath = path.join(
-    dataPath,
-    'work-instructions',
-    `drawing-${drawingNumber}`,
+    await resolveDrawingPath(dataPath, drawingNumber),
     'instruction.json'
   )
   
@@ -328,11 +327,7 @@ export async function POST(
 
     // 保存先パス
     const dataPath = getDataPath()
-    const basePath = path.join(
-      dataPath,
-      'work-instructions',
-      `drawing-${drawingNumber}`
-    )
+    const basePath = await resolveDrawingPath(dataPath, drawingNumber)
 
     // ファイルタイプごとに処理
     for (const [fileType, fileList] of Object.entries(filesByType)) {
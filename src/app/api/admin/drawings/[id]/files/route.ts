@@ -6,6 +6,7 @@ import path from 'path'
 import { getDataPath, createSafeFileName } from '@/lib/admin/utils'
 import { getStepFolderName } from '@/lib/machineTypeUtils'
 import { logAuditEvent, extractAuditActorFromHeaders } from '@/lib/auditLogger'
+import { resolveDrawingPath } from '@/lib/drawingPaths'
 
 
 // ファイルアップロード
@@ -63,9 +64,7 @@ export async function POST(
     }
     
     const targetDir = path.join(
-      dataPath,
-      'work-instructions',
-      `drawing-${drawingNumber}`,
+      await resolveDrawingPath(dataPath, drawingNumber),
       fileType,
       subFolder
     )
@@ -148,9 +147,7 @@ export async function DELETE(
     }
     
     const filePath = path.join(
-      dataPath,
-      'work-instructions',
-      `drawing-${drawingNumber}`,
+      await resolveDrawingPath(dataPath, drawingNumber),
       fileType,
       subFolder,
       fileName
@@ -209,9 +206,7 @@ async function updateInstructionFile(
 ) {
   const dataPath = getDataPath()
   const instructionPath = path.join(
-    dataPath,
-    'work-instructions',
-    `drawing-${drawingNumber}`,
+    await resolveDrawingPath(dataPath, drawingNumber),
     'instruction.json'
   )
 
@@ -252,9 +247,7 @@ async function removeFromInstructionFile(
 ) {
   const dataPath = getDataPath()
   const instructionPath = path.join(
-    dataPath,
-    'work-instructions',
-    `drawing-${drawingNumber}`,
+    await resolveDrawingPath(dataPath, drawingNumber),
     'instruction.json'
   )
 
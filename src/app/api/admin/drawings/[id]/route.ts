@@ -6,6 +6,7 @@ import path from 'path'
 import { NearMissItem, WorkStep } from '@/lib/dataLoader'
 import { getDataPath } from '@/lib/admin/utils'
 import { logAuditEvent, extractAuditActorFromHeaders } from '@/lib/auditLogger'
+import { resolveDrawingPath } from '@/lib/drawingPaths'
 import { MachineTypeKey, normalizeMachineTypeInput, getMachineTypeJapanese } from '@/lib/machineTypeUtils'
 
 // 図番編集用の型定義
@@ -229,9 +230,7 @@ class UpdateTransaction {
   // instruction.json 更新
   async updateInstruction(drawingNumber: string, updateData: UpdateDrawingData) {
     const instructionPath = path.join(
-      this.dataPath,
-      'work-instructions',
-      `drawing-${drawingNumber}`,
+      await resolveDrawingPath(this.dataPath, drawingNumber),
       'instruction.json'
     )
 
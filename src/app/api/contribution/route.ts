@@ -4,6 +4,7 @@ import { existsSync } from 'fs'
 import path from 'path'
 import { ContributionData, ContributionFile, ContributionFileData } from '@/types/contribution'
 import { sanitizeDrawingNumber } from '@/lib/dataLoader'
+import { resolveDrawingPath } from '@/lib/drawingPaths'
 
 function generateId(): string {
   return Date.now().toString() + '_' + Math.random().toString(36).substr(2, 9)
@@ -63,16 +64,16 @@ function validateFiles(files: File[]): { valid: boolean; error?: string } {
   return { valid: true }
 }
 
-function getContributionPath(drawingNumber: string): string {
+async function getContributionPath(drawingNumber: string): Promise<string> {
   const safeDrawingNumber = sanitizeDrawingNumber(drawingNumber)
   if (process.env.NODE_ENV === 'production') {
-    return path.join(process.env.DATA_ROOT_PATH || './public/data_demo',
-                    'work-instructions', `drawing-${safeDrawingNumber}`, 'contributions')
+    const dataRoot = process.env.DATA_ROOT_PATH || './public/data_demo'
+    return path.join(await resolveDrawingPath(dataRoot, safeDrawingNumber), 'contributions')
   }
   // 開発環境では環境変数を優先
   const devDataPath = process.env.DEV_DATA_ROOT_PATH || process.env.DATA_ROOT_PATH || './public/data'
-  return path.join(process.cwd(), devDataPath.replace(/^\.\//, ''), 'work-instructions',
-                  `drawing-${safeDrawingNumber}`, 'contributions')
+  const dataRoot = path.join(process.cwd(), devDataPath.replace(/^\.\//, ''))
+  return path.join(await resolveDrawingPath(dataRoot, safeDrawingNumber), 'contributions')
 }
 
 async function ensureContributionDirectory(contributionPath: string): Promise<void> {
@@ -141,7 +142,7 @@ export async function POST(request: NextRequest) {
       }
     }
 
-    const contributionPath = getContributionPath(drawingNumber)
+    const contributionPath = await getContributionPath(drawingNumber)
     await ensureContributionDirectory(contributionPath)
 
     const contributionFile = await loadContributionFile(contributionPath)
@@ -236,7 +237,7 @@ export async function GET(request: NextRequest) {
       return NextResponse.json({ error: 'Drawing number required' }, { status: 400 })
     }
 
-    const contributionPath = getContributionPath(drawingNumber)
+    const contributionPath = await getContributionPath(drawingNumber)
     const contributionFile = await loadContributionFile(contributionPath)
 
     return NextResponse.json(contributionFile)
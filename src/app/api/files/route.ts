@@ -3,6 +3,8 @@ import { readdir } from 'fs/promises'
 import { join, extname } from 'path'
 import { existsSync } from 'fs'
 import { createErrorResponse, createSuccessResponse, logError, createValidationError } from '@/lib/apiUtils'
+import { resolveMediaFile, listColdFiles } from '@/lib/mediaTier'
+import { resolveDrawingPath } from '@/lib/drawingPaths'
 
 const getDataRootPath = (): string => {
   // USE_NASの設定を最優先
@@ -64,18 +66,20 @@ export async function GET(request: NextRequest) {
     // 単一ファイル配信（優先処理）
     if (fileName && drawingNumber && folderType) {
       const dataRoot = getDataRootPath()
-      const basePath = join(dataRoot, 'work-instructions', `drawing-${drawingNumber}`, folderType)
+      const basePath = join(await resolveDrawingPath(dataRoot, drawingNumber), folderType)
       const safePath = fileName.replace(/\.\./g, '').replace(/[<>"|*?]/g, '')
       const fullFilePath = subFolder 
         ? join(basePath, subFolder, safePath)
         : join(basePath, safePath)
       
-      if (!existsSync(fullFilePath)) {
+      // 二次ストレージへ移動済みの動画はそちらから配信する
+      const resolvedPath = await resolveMediaFile(dataRoot, fullFilePath)
+      if (!resolvedPath) {
         return NextResponse.json({ error: 'File not found' }, { status: 404 })
       }
 
       const { readFile } = await import('fs/promises')
-      const fileBuffer = await readFile(fullFilePath)
+      const fileBuffer = await readFile(resolvedPath)
       
       // ファイル拡張子からMIMEタイプを判定
       const ext = extname(fullFilePath).toLowerCase()
@@ -113,16 +117,17 @@ export async function GET(request: NextRequest) {
       
       // 追加投稿ファイルの直接配信
       const dataRoot = getDataRootPath()
-      const contributionPath = join(dataRoot, 'work-instructions', `drawing-${drawingNumber}`, 'contributions')
+      const contributionPath = join(await resolveDrawingPath(dataRoot, drawingNumber), 'contributions')
       const safePath = contributionFile.replace(/\.\./g, '').replace(/[<>"|*?]/g, '')
       const fullFilePath = join(contributionPath, safePath)
 
-      if (!existsSync(fullFilePath)) {
+      const resolvedPath = await resolveMediaFile(dataRoot, fullFilePath)
+      if (!resolvedPath) {
         return NextResponse.json({ error: 'File not found' }, { status: 404 })
       }
 
       const { readFile } = await import('fs/promises')
-      const fileBuffer = await readFile(fullFilePath)
+      const fileBuffer = await readFile(resolvedPath)
       
       // ファイル拡張子からMIMEタイプを判定
       const ext = extname(fullFilePath).toLowerCase()
@@ -182,7 +187,7 @@ export async function GET(request: NextRequest) {
       folderPath = subFolder ? join(basePath, subFolder) : basePath
     } else {
       // 作業手順用のパス構築（既存）
-      basePath = join(dataRoot, 'work-instructions', `drawing-${drawingNumber}`, folderType)
+      basePath = join(await resolveDrawingPath(dataRoot, drawingNumber!), folderType)
       folderPath = subFolder ? join(basePath, subFolder) : basePath
     }
 
@@ -205,6 +210,13 @@ export async function GET(request: NextRequest) {
       }
     }
 
+    // 二次ストレージへ移動済みのファイルも一覧に含める
+    for (const file of await listColdFiles(dataRoot, folderPath)) {
+      if (!fileList.includes(file)) {
+        fileList.push(file)
+      }
+    }
+
     // ファイルタイプに応じてフィルタリング
     const filteredFiles = fileList.filter(file => {
       const extension = file.toLowerCase().split('.').pop()
@@ -0,0 +1,47 @@
+// src/app/api/page-aggregates/route.ts - ページ別集計API
+
+import { NextRequest, NextResponse } from 'next/server'
+import { getDataPath } from '@/lib/admin/utils'
+import { getPageAggregate, pageKey } from '@/lib/pageAggregates'
+
+export async function GET(request: NextRequest) {
+  const { searchParams } = new URL(request.url)
+  const key = pageKey(
+    searchParams.get('page') || '',
+    searchParams.get('companyId'),
+    searchParams.get('category')
+  )
+
+  if (!key) {
+    return NextResponse.json(
+      { error: 'page（home / category / drawings）と必要なパラメータを指定してください' },
+      { status: 400 }
+    )
+  }
+
+  try {
+    const aggregate = await getPageAggregate(getDataPath(), key)
+    if (!aggregate) {
+      return NextResponse.json({ error: '指定されたページが見つかりません' }, { status: 404 })
+    }
+
+    const headers = {
+      'Content-Type': 'application/json; charset=utf-8',
+      'Cache-Control': 'no-cache',
+      'ETag': aggregate.etag
+    }
+
+    const ifNoneMatch = request.headers.get('if-none-match') || ''
+    if (ifNoneMatch.split(',').some(tag => tag.trim().replace(/^W\//, '') === aggregate.etag)) {
+      return new NextResponse(null, { status: 304, headers })
+    }
+
+    return new NextResponse(new Uint8Array(aggregate.body), { headers })
+  } catch (error) {
+    console.error('ページ集計取得エラー:', error)
+    return NextResponse.json(
+      { error: 'ページ集計の取得に失敗しました' },
+      { status: 500 }
+    )
+  }
+}
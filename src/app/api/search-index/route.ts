@@ -1,15 +1,54 @@
 ﻿import { normalizeMachineTypeInput } from '@/lib/machineTypeUtils'
 // src/app/api/search-index/route.ts - 検索インデックスAPI
 
-import { NextResponse } from 'next/server'
+import { NextRequest, NextResponse } from 'next/server'
 import { promises as fs } from 'fs'
 import path from 'path'
 import { getDataPath } from '@/lib/admin/utils'
+import { getSearchIndexArtifact } from '@/lib/searchIndexShards'
 
-export async function GET() {
+/**
+ * 会社別シャード（?company=<会社ID>）またはマニフェスト（?manifest=1）を返す
+ * 圧縮済みファイルをそのまま返し、ETag で再検証させる
+ */
+async function serveShard(request: NextRequest, dataPath: string, companyId: string | null) {
+  const artifact = await getSearchIndexArtifact(
+    dataPath,
+    companyId,
+    request.headers.get('accept-encoding') || ''
+  )
+  if (!artifact) {
+    return NextResponse.json({ error: '指定された会社の図番が見つかりません' }, { status: 404 })
+  }
+
+  const headers: Record<string, string> = {
+    'Content-Type': 'application/json; charset=utf-8',
+    'Cache-Control': 'no-cache',
+    'ETag': artifact.etag,
+    'Vary': 'Accept-Encoding'
+  }
+  if (artifact.encoding !== 'identity') {
+    headers['Content-Encoding'] = artifact.encoding
+  }
+
+  const ifNoneMatch = request.headers.get('if-none-match') || ''
+  if (ifNoneMatch.split(',').some(tag => tag.trim().replace(/^W\//, '') === artifact.etag)) {
+    return new NextResponse(null, { status: 304, headers })
+  }
+
+  return new NextResponse(new Uint8Array(artifact.body), { headers })
+}
+
+export async function GET(request: NextRequest) {
   try {
     // ファイルパスの構築
     const dataPath = getDataPath()
+    const { searchParams } = new URL(request.url)
+    const companyId = searchParams.get('company')
+    if (companyId !== null || searchParams.has('manifest')) {
+      return await serveShard(request, dataPath, companyId)
+    }
+
     const filePath = path.join(dataPath, 'search-index.json')
 
     // ファイルの読み込み
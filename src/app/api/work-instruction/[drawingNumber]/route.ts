@@ -6,6 +6,7 @@ import { promises as fs } from 'fs'
 import path from 'path'
 import { getDataPath } from '@/lib/admin/utils'
 import { sanitizeDrawingNumber } from '@/lib/dataLoader'
+import { resolveDrawingPath } from '@/lib/drawingPaths'
 
 export async function GET(
   request: NextRequest,
@@ -27,9 +28,7 @@ export async function GET(
     // ファイルパスの構築
     const dataPath = getDataPath()
     const filePath = path.join(
-      dataPath,
-      'work-instructions',
-      `drawing-${safeDrawingNumber}`,
+      await resolveDrawingPath(dataPath, safeDrawingNumber),
       'instruction.json'
     )
 
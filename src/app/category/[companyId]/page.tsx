@@ -1,7 +1,7 @@
 'use client'
 import { useEffect, useState, use } from 'react'
 import { useRouter } from 'next/navigation'
-import { loadCompanies, Company } from '@/lib/dataLoader'
+import { loadPageAggregate, CategoryPageAggregate } from '@/lib/dataLoader'
 
 interface CategoryPageProps {
   params: Promise<{
@@ -11,19 +11,17 @@ interface CategoryPageProps {
 
 export default function CategoryPage({ params }: CategoryPageProps) {
   const { companyId } = use(params)
-  const [selectedCompany, setSelectedCompany] = useState<Company | null>(null)
+  const [aggregate, setAggregate] = useState<CategoryPageAggregate | null>(null)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
   const router = useRouter()
 
   useEffect(() => {
-    // 会社データを読み込み
-    loadCompanies()
-      .then((companiesData) => {
-        // URLパラメータから会社を特定
-        const company = companiesData.find(c => c.id === companyId)
-        if (company) {
-          setSelectedCompany(company)
+    // この会社のカテゴリ集計だけを読み込み
+    loadPageAggregate('category', companyId)
+      .then((categoryAggregate) => {
+        if (categoryAggregate) {
+          setAggregate(categoryAggregate)
         } else {
           setError('指定された会社が見つかりません')
         }
@@ -76,7 +74,7 @@ export default function CategoryPage({ params }: CategoryPageProps) {
     )
   }
 
-  if (!selectedCompany) {
+  if (!aggregate) {
     return (
       <div className="min-h-screen bg-gradient-to-br from-slate-900 via-purple-900 to-slate-900">
         <div className="container mx-auto px-4 py-8">
@@ -95,14 +93,6 @@ export default function CategoryPage({ params }: CategoryPageProps) {
     )
   }
 
-  // 重複チェックしてユニークなカテゴリを抽出
-  const categories = selectedCompany.products.reduce((acc, product) => {
-    if (!acc.includes(product.category)) {
-      acc.push(product.category)
-    }
-    return acc
-  }, [] as string[])
-
   return (
     <div className="min-h-screen bg-gradient-to-br from-slate-900 via-purple-900 to-slate-900">
       <div className="container mx-auto px-4 py-8">
@@ -118,20 +108,20 @@ export default function CategoryPage({ params }: CategoryPageProps) {
 
           {/* タイトル */}
           <h2 className="text-2xl font-bold mb-8 text-center text-emerald-100">
-            {selectedCompany.name} のカテゴリを選択
+            {aggregate.company.name} のカテゴリを選択
           </h2>
 
           {/* カテゴリ一覧 */}
           <div className="selection-grid w-full">
-            {categories.map((category) => (
+            {aggregate.categories.map((category) => (
               <button
-                key={category}
+                key={category.name}
                 className="selection-card"
-                onClick={() => handleCategorySelect(category)}
+                onClick={() => handleCategorySelect(category.name)}
               >
                 <div className="icon">📂</div>
-                <div className="title">{category}</div>
-                <div className="desc">カテゴリ</div>
+                <div className="title">{category.name}</div>
+                <div className="desc">{category.drawingCount}図番</div>
               </button>
             ))}
           </div>
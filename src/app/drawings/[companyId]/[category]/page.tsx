@@ -1,7 +1,7 @@
 'use client'
 import { useEffect, useState, use } from 'react'
 import { useRouter } from 'next/navigation'
-import { loadCompanies, Company, loadSearchIndex } from '@/lib/dataLoader'
+import { loadPageAggregate, DrawingsPageAggregate } from '@/lib/dataLoader'
 
 interface DrawingsPageProps {
   params: Promise<{
@@ -12,46 +12,19 @@ interface DrawingsPageProps {
 
 export default function DrawingsPage({ params }: DrawingsPageProps) {
   const { companyId, category } = use(params)
-  const [selectedCompany, setSelectedCompany] = useState<Company | null>(null)
-  const [selectedCategory, setSelectedCategory] = useState<string | null>(null)
-  const [displayDrawingMap, setDisplayDrawingMap] = useState<Record<string, string>>({})
+  const [aggregate, setAggregate] = useState<DrawingsPageAggregate | null>(null)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
   const router = useRouter()
 
   useEffect(() => {
-    // 会社データと検索インデックスを並行読み込み
-    Promise.all([loadCompanies(), loadSearchIndex()])
-      .then(([companiesData, searchIndex]) => {
-        // displayDrawingNumber マッピングを作成
-        const drawingMap: Record<string, string> = {}
-        for (const drawing of searchIndex.drawings) {
-          if (drawing.displayDrawingNumber) {
-            drawingMap[drawing.drawingNumber] = drawing.displayDrawingNumber
-          }
-        }
-        setDisplayDrawingMap(drawingMap)
-
-        // URLパラメータから会社とカテゴリを特定
-        const company = companiesData.find(c => c.id === companyId)
-        if (company) {
-          setSelectedCompany(company)
-          // カテゴリの存在確認
-          const categories = company.products.reduce((acc, product) => {
-            if (!acc.includes(product.category)) {
-              acc.push(product.category)
-            }
-            return acc
-          }, [] as string[])
-
-          const decodedCategory = decodeURIComponent(category)
-          if (categories.includes(decodedCategory)) {
-            setSelectedCategory(decodedCategory)
-          } else {
-            setError('指定されたカテゴリが見つかりません')
-          }
+    // この会社・カテゴリの図番一覧の集計だけを読み込み
+    loadPageAggregate('drawings', companyId, decodeURIComponent(category))
+      .then((drawingsAggregate) => {
+        if (drawingsAggregate) {
+          setAggregate(drawingsAggregate)
         } else {
-          setError('指定された会社が見つかりません')
+          setError('指定された会社・カテゴリが見つかりません')
         }
         setLoading(false)
       })
@@ -116,7 +89,7 @@ export default function DrawingsPage({ params }: DrawingsPageProps) {
     )
   }
 
-  if (!selectedCompany || !selectedCategory) {
+  if (!aggregate) {
     return (
       <div className="min-h-screen bg-gradient-to-br from-slate-900 via-purple-900 to-slate-900">
         <div className="container mx-auto px-4 py-8">
@@ -144,11 +117,6 @@ export default function DrawingsPage({ params }: DrawingsPageProps) {
     )
   }
 
-  // 選択されたカテゴリの製品をフィルタリング
-  const categoryProducts = selectedCompany.products.filter(
-    product => product.category === selectedCategory
-  )
-
   return (
     <div className="min-h-screen bg-gradient-to-br from-slate-900 via-purple-900 to-slate-900">
       <div className="container mx-auto px-4 py-8">
@@ -159,25 +127,25 @@ export default function DrawingsPage({ params }: DrawingsPageProps) {
             className="custom-rect-button gray mb-6"
           >
             <span>←</span>
-            <span>{selectedCompany.name} のカテゴリ一覧に戻る</span>
+            <span>{aggregate.company.name} のカテゴリ一覧に戻る</span>
           </button>
 
           {/* タイトル */}
           <h2 className="text-2xl font-bold mb-8 text-center text-emerald-100">
-            {selectedCategory} の図番を選択
+            {aggregate.category} の図番を選択
           </h2>
 
           {/* 図番一覧 */}
           <div className="selection-grid w-full">
-            {categoryProducts.map((product) =>
-              product.drawings.map((drawingNumber) => (
+            {aggregate.products.map((product) =>
+              product.drawings.map((drawing) => (
                 <button
-                  key={drawingNumber}
+                  key={drawing.drawingNumber}
                   className="selection-card"
-                  onClick={() => handleDrawingSelect(drawingNumber)}
+                  onClick={() => handleDrawingSelect(drawing.drawingNumber)}
                 >
                   <div className="icon">📄</div>
-                  <div className="title">{displayDrawingMap[drawingNumber] || drawingNumber}</div>
+                  <div className="title">{drawing.displayDrawingNumber || drawing.drawingNumber}</div>
                   <div className="desc">{product.name}</div>
                 </button>
               ))
@@ -2,13 +2,13 @@
 'use client'
 import { useEffect, useState } from 'react'
 import { useRouter } from 'next/navigation'
-import { loadCompanies, loadSearchIndex, Company, SearchIndex, DrawingSearchItem } from '@/lib/dataLoader'
+import { loadPageAggregate, loadSearchIndexFromShards, HomePageAggregate, SearchIndex, DrawingSearchItem } from '@/lib/dataLoader'
 import SearchBar from '@/components/SearchBar'
 import RecentContributions from '@/components/RecentContributions'
 import Header from '@/components/Header'
 
 export default function Home() {
-  const [companies, setCompanies] = useState<Company[]>([])
+  const [companies, setCompanies] = useState<HomePageAggregate['companies']>([])
   const [searchIndex, setSearchIndex] = useState<SearchIndex | null>(null)
   const [searchResults, setSearchResults] = useState<DrawingSearchItem[]>([])
   const [showSearchResults, setShowSearchResults] = useState(false)
@@ -17,20 +17,19 @@ export default function Home() {
   const router = useRouter()
 
   useEffect(() => {
-    // 会社データと検索インデックスを並行して読み込み
-    Promise.all([
-      loadCompanies(),
-      loadSearchIndex()
-    ])
-      .then(([companiesData, searchIndexData]) => {
-        setCompanies(companiesData)
-        setSearchIndex(searchIndexData)
+    // 会社一覧はトップページ用の集計だけで表示する
+    loadPageAggregate('home')
+      .then((homeAggregate) => {
+        setCompanies(homeAggregate?.companies || [])
         setLoading(false)
       })
       .catch(() => {
         setError('データの読み込みに失敗しました')
         setLoading(false)
       })
+
+    // 検索インデックスは検索バー用なので会社一覧の表示を待たせない
+    loadSearchIndexFromShards().then(setSearchIndex)
   }, [])
 
   // 検索結果の処理
@@ -45,8 +44,8 @@ export default function Home() {
   }
 
   // 会社選択時の処理
-  const handleCompanySelect = (company: Company) => {
-    router.push(`/category/${company.id}`)
+  const handleCompanySelect = (companyId: string) => {
+    router.push(`/category/${companyId}`)
   }
 
   // 追記から図番へ遷移
@@ -128,7 +127,7 @@ export default function Home() {
                   <button
                     key={company.id}
                     className="selection-card"
-                    onClick={() => handleCompanySelect(company)}
+                    onClick={() => handleCompanySelect(company.id)}
                   >
                     <div className="icon">🏢</div>
                     <div className="title">{company.name}</div>
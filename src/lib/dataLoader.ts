@@ -144,6 +144,33 @@ export interface DrawingSearchItem {
   createdAt?: string
 }
 
+// ページ別の集計（/api/page-aggregates）
+export interface HomePageAggregate {
+  companies: Array<Pick<Company, 'id' | 'name' | 'description'>>
+}
+
+export interface CategoryPageAggregate {
+  company: { id: string; name: string }
+  categories: Array<{ name: string; drawingCount: number }>
+}
+
+export interface DrawingsPageAggregate {
+  company: { id: string; name: string }
+  category: string
+  products: Array<{
+    id: string
+    name: string
+    drawings: Array<{ drawingNumber: string; displayDrawingNumber?: string }>
+  }>
+}
+
+// 会社別検索インデックスシャードのマニフェスト
+export interface SearchIndexManifest {
+  metadata: SearchMetadata
+  totalDrawings: number
+  companies: Record<string, { companyName: string; drawingCount: number }>
+}
+
 // 作業手順メタデータ
 export interface InstructionMetadata {
   drawingNumber: string
@@ -345,6 +372,97 @@ export const loadSearchIndex = async (): Promise<SearchIndex> => {
   }
 }
 
+// 会社一覧と図番数だけのマニフェストを取得（ETag で再検証される）
+export const loadSearchIndexManifest = async (): Promise<SearchIndexManifest | null> => {
+  try {
+    const response = await fetch('/api/search-index?manifest=1');
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    return await response.json();
+  } catch (error) {
+    if (process.env.NODE_ENV === 'development') {
+      console.error('検索インデックスマニフェストの読み込みに失敗:', error);
+    }
+    return null;
+  }
+}
+
+// 検索インデックス全体を会社別シャードから組み立てる
+// シャードごとに圧縮済みファイルで配信・ETag で再検証されるので、変更の無い会社分は再取得しない
+// 同じページ内の同時呼び出し（検索バー・最新追記）は1回の取得にまとめる
+let shardIndexRequest: Promise<SearchIndex> | null = null
+
+export const loadSearchIndexFromShards = (): Promise<SearchIndex> => {
+  if (!shardIndexRequest) {
+    shardIndexRequest = fetchSearchIndexFromShards().finally(() => {
+      shardIndexRequest = null;
+    });
+  }
+  return shardIndexRequest;
+}
+
+const fetchSearchIndexFromShards = async (): Promise<SearchIndex> => {
+  const manifest = await loadSearchIndexManifest();
+  if (!manifest) {
+    return loadSearchIndex();
+  }
+  const shards = await Promise.all(
+    Object.keys(manifest.companies).map(companyId => loadCompanySearchIndex(companyId))
+  );
+  return {
+    drawings: shards.flat(),
+    metadata: {
+      lastIndexed: new Date().toISOString(),
+      version: '1.0',
+      ...manifest.metadata,
+      totalDrawings: manifest.totalDrawings
+    }
+  };
+}
+
+// ページ表示に必要な集計だけを取得（該当する会社・カテゴリが無ければ null）
+export function loadPageAggregate(page: 'home'): Promise<HomePageAggregate | null>
+export function loadPageAggregate(page: 'category', companyId: string): Promise<CategoryPageAggregate | null>
+export function loadPageAggregate(page: 'drawings', companyId: string, category: string): Promise<DrawingsPageAggregate | null>
+export async function loadPageAggregate(page: string, companyId?: string, category?: string) {
+  const params = new URLSearchParams({ page })
+  if (companyId) params.set('companyId', companyId)
+  if (category) params.set('category', category)
+
+  const response = await fetch(`/api/page-aggregates?${params.toString()}`);
+  if (response.status === 404) {
+    return null;
+  }
+  if (!response.ok) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
+  return response.json();
+}
+
+// 1社分の図番だけを取得（検索インデックス全体は読まない）
+export const loadCompanySearchIndex = async (companyId: string): Promise<DrawingSearchItem[]> => {
+  try {
+    const response = await fetch(`/api/search-index?company=${encodeURIComponent(companyId)}`);
+    if (response.status === 404) {
+      return [];
+    }
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    const result: { drawings: DrawingSearchItem[] } = await response.json();
+    return result.drawings.map(drawing => ({
+      ...drawing,
+      machineType: normalizeMachineTypeInput(drawing.machineType)
+    }));
+  } catch (error) {
+    if (process.env.NODE_ENV === 'development') {
+      console.error(`会社別検索インデックスの読み込みに失敗 (${companyId}):`, error);
+    }
+    return [];
+  }
+}
+
 export const loadWorkInstruction = async (drawingNumber: string): Promise<WorkInstruction | null> => {
   try {
     if (process.env.DEBUG_DATA_LOADING === 'true') {
@@ -364,10 +482,11 @@ export const loadWorkInstruction = async (drawingNumber: string): Promise<WorkIn
     }
     const workInstruction: WorkInstruction = await response.json();
     
-    // 検索インデックスから会社名と製品名を取得
+    // 会社別の検索インデックスから会社名と製品名を取得
     try {
-      const searchIndex = await loadSearchIndex();
-      const drawingSearchItem = searchIndex.drawings.find(d => d.drawingNumber === drawingNumber);
+      const companyId = workInstruction.metadata.companyId;
+      const companyDrawings = companyId ? await loadCompanySearchIndex(companyId) : [];
+      const drawingSearchItem = companyDrawings.find(d => d.drawingNumber === drawingNumber);
       
       if (drawingSearchItem) {
         workInstruction.metadata.companyName = drawingSearchItem.companyName;
@@ -482,8 +601,8 @@ export const loadContributions = async (drawingNumber: string): Promise<Contribu
 // 全図番の最新追記データを取得
 export const loadRecentContributions = async (limit: number = 10): Promise<{ drawingNumber: string, displayDrawingNumber?: string, contribution: ContributionData, drawingTitle?: string }[]> => {
   try {
-    // 検索インデックスから全図番を取得
-    const searchIndex = await loadSearchIndex()
+    // 会社別シャードから全図番を取得（トップページの検索バーと同じ取得を共有する）
+    const searchIndex = await loadSearchIndexFromShards()
     const allContributions: { drawingNumber: string, displayDrawingNumber?: string, contribution: ContributionData, drawingTitle?: string }[] = []
 
     // 各図番の追記データを並列取得
@@ -525,8 +644,8 @@ export const loadRecentContributions = async (limit: number = 10): Promise<{ dra
 // 全図番の全追記データを取得（管理画面用：全ステータス）
 export const loadAllContributions = async (limit: number = 1000): Promise<{ drawingNumber: string, displayDrawingNumber?: string, contribution: ContributionData, drawingTitle?: string }[]> => {
   try {
-    // 検索インデックスから全図番を取得
-    const searchIndex = await loadSearchIndex()
+    // 会社別シャードから全図番を取得
+    const searchIndex = await loadSearchIndexFromShards()
     const allContributions: { drawingNumber: string, displayDrawingNumber?: string, contribution: ContributionData, drawingTitle?: string }[] = []
 
     // 各図番の追記データを並列取得
@@ -0,0 +1,110 @@
+// src/lib/drawingDigest.ts - チャット用 図番ダイジェストキャッシュの読み込み
+//
+// キャッシュは scripts/build_chat_digests.py が <データルート>/chat-digests.json に作成する。
+// instruction.json / contributions.json の更新時刻・サイズが記録時と異なる図番は
+// 古いダイジェストとして扱い、null を返す（呼び出し側で元ファイルを読む）。
+
+import path from 'path'
+import { promises as fs } from 'fs'
+
+const CACHE_NAME = 'chat-digests.json'
+const DIGEST_VERSION = 1
+
+export interface DrawingDigest {
+  drawingNumber: string
+  title: string
+  companyId: string
+  machineTypes: string[]
+  difficulty: string
+  estimatedTime: string
+  toolsRequired: string[]
+  materials: string[]
+  stepCount: number
+  cuttingConditions: string[]
+  warnings: string[]
+  troubleshooting: Array<{ problem: string; solution: string }>
+}
+
+interface FileSignature {
+  mtimeNs: string
+  size: number
+}
+
+interface DigestEntry {
+  sourceHash: string
+  sources: {
+    instruction: FileSignature | null
+    contributions: FileSignature | null
+  }
+  digest: DrawingDigest
+}
+
+interface DigestCacheFile {
+  version: number
+  generatedAt: string
+  digests: Record<string, DigestEntry>
+}
+
+// entries が null のときは、その更新時刻のファイルが使えない（版違い・壊れている）ことを表す
+let cached: { filePath: string; mtimeMs: number; entries: Map<string, DigestEntry> | null } | null = null
+
+async function loadDigestEntries(dataRootPath: string): Promise<Map<string, DigestEntry> | null> {
+  const filePath = path.join(dataRootPath, CACHE_NAME)
+
+  let mtimeMs: number
+  try {
+    mtimeMs = (await fs.stat(filePath)).mtimeMs
+  } catch {
+    return null
+  }
+
+  if (cached && cached.filePath === filePath && cached.mtimeMs === mtimeMs) {
+    return cached.entries
+  }
+
+  // 使えないファイルも更新時刻と一緒に覚え、作り直されるまで読み直さない
+  let entries: Map<string, DigestEntry> | null = null
+  try {
+    const data = JSON.parse(await fs.readFile(filePath, 'utf-8')) as DigestCacheFile
+    if (data.version === DIGEST_VERSION) {
+      entries = new Map(Object.entries(data.digests))
+    }
+  } catch (error) {
+    console.error('ダイジェストキャッシュ読み込みエラー:', error)
+  }
+  cached = { filePath, mtimeMs, entries }
+  return entries
+}
+
+async function matchesSignature(filePath: string, signature: FileSignature | null): Promise<boolean> {
+  try {
+    const stat = await fs.stat(filePath, { bigint: true })
+    return signature !== null &&
+      stat.mtimeNs.toString() === signature.mtimeNs &&
+      Number(stat.size) === signature.size
+  } catch {
+    // ファイルが無い場合は、記録時にも無かったときだけ一致とみなす
+    return signature === null
+  }
+}
+
+/**
+ * 図番フォルダ（例: drawing-DEMO-001）の最新ダイジェストを返す
+ * キャッシュが無い・古い場合は null
+ */
+export async function getFreshDrawingDigest(
+  dataRootPath: string,
+  folderName: string
+): Promise<DrawingDigest | null> {
+  const entries = await loadDigestEntries(dataRootPath)
+  const entry = entries?.get(folderName)
+  if (!entry) return null
+
+  const folderPath = path.join(dataRootPath, 'work-instructions', folderName)
+  const [instructionFresh, contributionsFresh] = await Promise.all([
+    matchesSignature(path.join(folderPath, 'instruction.json'), entry.sources.instruction),
+    matchesSignature(path.join(folderPath, 'contributions', 'contributions.json'), entry.sources.contributions)
+  ])
+
+  return instructionFresh && contributionsFresh ? entry.digest : null
+}
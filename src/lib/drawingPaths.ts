@@ -0,0 +1,82 @@
+// src/lib/drawingPaths.ts - 図番フォルダの場所解決
+//
+// work-instructions 配下は flat（drawing-<図番>）のほか、会社ID別・ハッシュ別の
+// シャード配置にできる（scripts/shard_work_instructions.py）。その場合は
+// <データルート>/drawing-paths.json に 図番 → 相対パス の索引が作られる。
+// 索引が無い図番は flat 配置として扱う。
+
+import path from 'path'
+import { promises as fs } from 'fs'
+
+const INDEX_NAME = 'drawing-paths.json'
+const FOLDER_PREFIX = 'drawing-'
+
+interface DrawingPathIndex {
+  layout: 'flat' | 'company' | 'hash'
+  paths: Record<string, string>
+}
+
+let cached: { filePath: string; mtimeMs: number; paths: Map<string, string> } | null = null
+
+async function loadIndex(dataRootPath: string): Promise<Map<string, string> | null> {
+  const filePath = path.join(dataRootPath, INDEX_NAME)
+
+  let mtimeMs: number
+  try {
+    mtimeMs = (await fs.stat(filePath)).mtimeMs
+  } catch {
+    return null
+  }
+
+  if (cached && cached.filePath === filePath && cached.mtimeMs === mtimeMs) {
+    return cached.paths
+  }
+
+  const index = JSON.parse(await fs.readFile(filePath, 'utf-8')) as DrawingPathIndex
+  cached = { filePath, mtimeMs, paths: new Map(Object.entries(index.paths)) }
+  return cached.paths
+}
+
+/**
+ * 図番フォルダの work-instructions からの相対パス
+ */
+export async function resolveDrawingFolder(dataRootPath: string, drawingNumber: string): Promise<string> {
+  const paths = await loadIndex(dataRootPath)
+  return paths?.get(drawingNumber) || `${FOLDER_PREFIX}${drawingNumber}`
+}
+
+/**
+ * 図番フォルダの絶対パス（存在確認はしない）
+ * 索引に無い図番（新規登録など）は flat 配置の場所を返す
+ */
+export async function resolveDrawingPath(dataRootPath: string, drawingNumber: string): Promise<string> {
+  return path.join(dataRootPath, 'work-instructions', await resolveDrawingFolder(dataRootPath, drawingNumber))
+}
+
+/**
+ * 全図番フォルダの相対パス一覧
+ * 索引がある場合も、索引作成後に flat 配置で追加された図番を拾うため最上位は読む
+ */
+export async function listDrawingFolders(dataRootPath: string): Promise<string[]> {
+  const workInstructionsPath = path.join(dataRootPath, 'work-instructions')
+  const paths = await loadIndex(dataRootPath)
+  const folders = new Set<string>(paths ? paths.values() : [])
+
+  const entries = await fs.readdir(workInstructionsPath, { withFileTypes: true })
+  for (const entry of entries) {
+    if (!entry.isDirectory()) continue
+    if (entry.name.startsWith(FOLDER_PREFIX)) {
+      folders.add(entry.name)
+    } else if (!paths) {
+      // 索引なしでシャード配置されている場合は1階層下を見る
+      const children = await fs.readdir(path.join(workInstructionsPath, entry.name), { withFileTypes: true })
+      for (const child of children) {
+        if (child.isDirectory() && child.name.startsWith(FOLDER_PREFIX)) {
+          folders.add(`${entry.name}/${child.name}`)
+        }
+      }
+    }
+  }
+
+  return [...folders].sort()
+}
@@ -6,6 +6,7 @@ import { NewDrawingData, ProcessedDrawingData, DataTransaction } from './dataTra
 import { 
   generateBasicInstruction
 } from './drawingUtils'
+import { resolveDrawingPath } from './drawingPaths'
 
 // トランザクション操作のログ
 interface TransactionLog {
@@ -100,7 +101,7 @@ export class DrawingRegistrationTransaction {
   // 図面用フォルダ構造作成
   async createDrawingStructure(drawingNumber: string): Promise<void> {
     const dataPath = this.getDataPath()
-    const basePath = path.join(dataPath, 'work-instructions', `drawing-${drawingNumber}`)
+    const basePath = await resolveDrawingPath(dataPath, drawingNumber)
     
     // メインフォルダ
     await this.createDirectory(basePath)
@@ -116,9 +117,7 @@ export class DrawingRegistrationTransaction {
   async createInstructionFile(drawingData: ProcessedDrawingData): Promise<void> {
     const dataPath = this.getDataPath()
     const filePath = path.join(
-      dataPath, 
-      'work-instructions', 
-      `drawing-${drawingData.drawingNumber}`, 
+      await resolveDrawingPath(dataPath, drawingData.drawingNumber),
       'instruction.json'
     )
     
@@ -6,6 +6,7 @@ import path from 'path'
 import { sanitizeDrawingNumber } from './dataLoader'
 import { Company, Product, SearchIndex, WorkInstruction } from './dataLoader'
 import { MachineTypeKey } from './machineTypeUtils'
+import { resolveDrawingPath } from './drawingPaths'
 
 // 環境に応じたデータパス取得
 function getDataPath(): string {
@@ -41,7 +42,7 @@ export function generateProductId(productName: string): string {
 // フォルダ階層作成
 export async function createDrawingDirectoryStructure(drawingNumber: string): Promise<void> {
   const safeDrawingNumber = sanitizeDrawingNumber(drawingNumber)
-  const basePath = path.join(getDataPath(), 'work-instructions', `drawing-${safeDrawingNumber}`)
+  const basePath = await resolveDrawingPath(getDataPath(), safeDrawingNumber)
   
   // 必須フォルダ一覧（ステップフォルダは編集画面で必要時に作成）
   const requiredDirectories = [
@@ -75,7 +76,7 @@ export async function createDrawingDirectoryStructure(drawingNumber: string): Pr
 export async function savePdfFile(drawingNumber: string, pdfFile: File): Promise<string> {
   const safeDrawingNumber = sanitizeDrawingNumber(drawingNumber)
   const fileName = `${safeDrawingNumber}.pdf`
-  const basePath = path.join(getDataPath(), 'work-instructions', `drawing-${safeDrawingNumber}`)
+  const basePath = await resolveDrawingPath(getDataPath(), safeDrawingNumber)
   const filePath = path.join(basePath, 'pdfs', 'overview', fileName)
   
   // ファイル検証
@@ -98,7 +99,7 @@ export async function savePdfFile(drawingNumber: string, pdfFile: File): Promise
 // 図番重複チェック
 export async function checkDrawingNumberExists(drawingNumber: string): Promise<boolean> {
   const safeDrawingNumber = sanitizeDrawingNumber(drawingNumber)
-  const basePath = path.join(getDataPath(), 'work-instructions', `drawing-${safeDrawingNumber}`)
+  const basePath = await resolveDrawingPath(getDataPath(), safeDrawingNumber)
   
   try {
     await access(basePath)
@@ -177,7 +178,7 @@ export function generateBasicInstruction(data: {
 export async function saveInstructionFile(drawingNumber: string, instruction: WorkInstruction): Promise<void> {
   try {
     const safeDrawingNumber = sanitizeDrawingNumber(drawingNumber)
-    const basePath = path.join(getDataPath(), 'work-instructions', `drawing-${safeDrawingNumber}`)
+    const basePath = await resolveDrawingPath(getDataPath(), safeDrawingNumber)
     const filePath = path.join(basePath, 'instruction.json')
     
     console.log(`📝 instruction.json保存開始: ${filePath}`)
@@ -208,7 +209,7 @@ export async function validateDataIntegrity(drawingNumber: string): Promise<{
   
   try {
     // 1. フォルダ存在チェック
-    const basePath = path.join(getDataPath(), 'work-instructions', `drawing-${safeDrawingNumber}`)
+    const basePath = await resolveDrawingPath(getDataPath(), safeDrawingNumber)
     if (!existsSync(basePath)) {
       errors.push(`フォルダが存在しません: drawing-${safeDrawingNumber}`)
     }
@@ -1,4 +1,7 @@
-﻿import { normalizeMachineTypeInput, getMachineTypeJapanese } from './machineTypeUtils'
+﻿import { normalizeMachineTypeInput, getMachineTypeJapanese, MACHINE_TYPE_KEYS } from './machineTypeUtils'
+import { loadTfidfIndex, queryTfidfIndex } from './tfidfIndex'
+import { getFreshDrawingDigest } from './drawingDigest'
+import { listDrawingFolders } from './drawingPaths'
 /**
  * 社内データ検索・RAG機能モジュール V2
  * 検索精度向上版 - メタデータを最大限活用
@@ -45,6 +48,10 @@ export interface DrawingMatch {
   relevanceScore: number
   matchedFields: string[]
   workStepsCount: number
+  // 以下はダイジェストキャッシュから読んだ場合のみ
+  cuttingConditions?: string[]
+  warnings?: string[]
+  troubleshooting?: Array<{ problem: string; solution: string }>
 }
 
 export interface ContributionMatch {
@@ -511,6 +518,13 @@ async function searchCompanies(keywords: ExtractedKeywords): Promise<CompanyMatc
   }
 }
 
+// TF-IDF 類似度のキーワードスコアに対する重み
+const TFIDF_WEIGHT = 10
+// これ未満の類似度は共通語だけの一致とみなして加点しない
+const TFIDF_MIN_SCORE = 0.05
+// TF-IDF 上位から読む候補図番の数
+const TFIDF_CANDIDATES = 100
+
 /**
  * 作業手順データから検索（改良版）
  */
@@ -534,52 +548,100 @@ async function searchDrawings(keywords: ExtractedKeywords): Promise<DrawingMatch
     }
     
     const matches: DrawingMatch[] = []
-    const drawingDirs = await fs.readdir(workInstructionsPath, { withFileTypes: true })
     
-    for (const dir of drawingDirs) {
-      if (!dir.isDirectory()) continue
-      
+    // 候補は TF-IDF の上位と、インデックス作成後に追加された（meta.json に無い）図番フォルダ
+    // インデックスが無い場合・全件表示モードは全図番フォルダを読む
+    // シャード配置への移行後も対応が取れるようフォルダ名（drawing-<図番>）で照合する
+    const allDirNames = await listDrawingFolders(dataRootPath)
+    const tfidfIndex = keywords.showAll ? null : await loadTfidfIndex(dataRootPath)
+    const tfidfScores = new Map<string, number>()
+    let drawingDirNames = allDirNames
+    if (tfidfIndex) {
+      const hits = await queryTfidfIndex(dataRootPath, keywords.originalQuery, TFIDF_CANDIDATES) || []
+      for (const hit of hits) {
+        tfidfScores.set(path.basename(hit.folderPath), hit.score)
+      }
+      drawingDirNames = allDirNames.filter(dirName => {
+        const folderName = path.basename(dirName)
+        return tfidfScores.has(folderName) || !tfidfIndex.folderNames.has(folderName)
+      })
+    }
+    
+    for (const dirName of drawingDirNames) {
       try {
-        const instructionPath = path.join(workInstructionsPath, dir.name, 'instruction.json')
-        const instructionData = await fs.readFile(instructionPath, 'utf-8')
-        const instruction = JSON.parse(instructionData)
-        
-        const metadata = instruction.metadata || {}
-        const matchedFields: string[] = []
-        
-        // 高度なスコアリング
-        const relevanceScore = calculateRelevanceScore(keywords, metadata, matchedFields)
-        
-        // 作業ステップ数を取得
+        // ダイジェストが最新ならそれを使い、instruction.json 全体は読まない
+        const digest = await getFreshDrawingDigest(dataRootPath, dirName)
+        let metadata: Record<string, unknown>
         let workStepsCount = 0
-        if (instruction.workStepsByMachine) {
-          for (const steps of Object.values(instruction.workStepsByMachine)) {
+        
+        if (digest) {
+          metadata = {
+            drawingNumber: digest.drawingNumber,
+            title: digest.title,
+            companyId: digest.companyId,
+            machineType: digest.machineTypes,
+            difficulty: digest.difficulty,
+            estimatedTime: digest.estimatedTime,
+            toolsRequired: digest.toolsRequired
+          }
+          workStepsCount = digest.stepCount
+        } else {
+          const instructionPath = path.join(workInstructionsPath, dirName, 'instruction.json')
+          const instructionData = await fs.readFile(instructionPath, 'utf-8')
+          const instruction = JSON.parse(instructionData)
+          metadata = instruction.metadata || {}
+          
+          // 作業ステップ数を取得（scripts/instruction_data.py の iter_work_steps と同じ規則:
+          // workStepsByMachine が空の場合のみ旧形式の workSteps を数える）
+          const workStepsByMachine = instruction.workStepsByMachine || {}
+          for (const machineType of MACHINE_TYPE_KEYS) {
+            const steps = workStepsByMachine[machineType]
             if (Array.isArray(steps)) {
               workStepsCount += steps.length
             }
           }
+          if (workStepsCount === 0 && Array.isArray(instruction.workSteps)) {
+            workStepsCount = instruction.workSteps.length
+          }
+        }
+        
+        const matchedFields: string[] = []
+        
+        // 高度なスコアリング
+        let relevanceScore = calculateRelevanceScore(keywords, metadata, matchedFields)
+        
+        // 全文類似度（TF-IDF コサイン類似度）を加点
+        const tfidfScore = tfidfScores.get(path.basename(dirName)) || 0
+        if (tfidfScore >= TFIDF_MIN_SCORE) {
+          relevanceScore += tfidfScore * TFIDF_WEIGHT
+          matchedFields.push('全文類似')
         }
         
         // しきい値チェック（全件表示モード以外）
         if (relevanceScore > 0 || keywords.showAll) {
           // 材質を抽出（タイトルから）
-          const title = metadata.title || ''
+          const title = String(metadata.title || '')
           const detectedMaterials = keywords.materials.filter(m => 
             title.toLowerCase().includes(m.toLowerCase())
           )
           
           matches.push({
-            drawingNumber: metadata.drawingNumber || dir.name,
+            drawingNumber: String(metadata.drawingNumber || dirName),
             title: title,
-            companyId: metadata.companyId || 'unknown',
+            companyId: String(metadata.companyId || 'unknown'),
             machineTypes: Array.isArray(metadata.machineType) ? metadata.machineType : [],
-            materials: detectedMaterials,
-            difficulty: metadata.difficulty || 'unknown',
-            estimatedTime: metadata.estimatedTime || 'unknown',
+            materials: digest
+              ? [...detectedMaterials, ...digest.materials].filter((v, i, a) => a.indexOf(v) === i)
+              : detectedMaterials,
+            difficulty: String(metadata.difficulty || 'unknown'),
+            estimatedTime: String(metadata.estimatedTime || 'unknown'),
             toolsUsed: Array.isArray(metadata.toolsRequired) ? metadata.toolsRequired : [],
             relevanceScore,
             matchedFields: Array.isArray(matchedFields) ? matchedFields : [],
-            workStepsCount
+            workStepsCount,
+            cuttingConditions: digest?.cuttingConditions,
+            warnings: digest?.warnings,
+            troubleshooting: digest?.troubleshooting
           })
         }
         
@@ -630,15 +692,13 @@ async function searchContributions(keywords: ExtractedKeywords): Promise<Contrib
       return []
     }
     
-    const drawingDirs = await fs.readdir(workInstructionsPath, { withFileTypes: true })
+    const drawingDirNames = await listDrawingFolders(dataRootPath)
     
-    for (const dir of drawingDirs) {
-      if (!dir.isDirectory()) continue
-      
+    for (const dirName of drawingDirNames) {
       try {
         const contributionsPath = path.join(
           workInstructionsPath, 
-          dir.name, 
+          dirName, 
           'contributions', 
           'contributions.json'
         )
@@ -672,7 +732,7 @@ async function searchContributions(keywords: ExtractedKeywords): Promise<Contrib
             
             if (relevanceScore > 0) {
               matches.push({
-                drawingNumber: data.drawingNumber || dir.name,
+                drawingNumber: data.drawingNumber || path.basename(dirName),
                 contributor: contrib.userName || 'unknown',
                 content: contrib.text || '',
                 type: contrib.type || 'comment',
@@ -747,6 +807,15 @@ export function formatSearchResults(results: SearchResult): string {
         context += `   マッチ項目: ${drawing.matchedFields.join('、')}\n`
       }
       context += `   作業ステップ数: ${drawing.workStepsCount}工程\n`
+      if (drawing.cuttingConditions && drawing.cuttingConditions.length > 0) {
+        context += `   主な切削条件: ${drawing.cuttingConditions.join(' / ')}\n`
+      }
+      if (drawing.warnings && drawing.warnings.length > 0) {
+        context += `   注意事項: ${drawing.warnings.join(' / ')}\n`
+      }
+      if (drawing.troubleshooting && drawing.troubleshooting.length > 0) {
+        context += `   トラブル対応: ${drawing.troubleshooting.map(t => `${t.problem}→${t.solution}`).join(' / ')}\n`
+      }
     })
     context += `\n`
   }
@@ -1,4 +1,5 @@
 ﻿import { normalizeMachineTypeInput, getMachineTypeJapanese } from './machineTypeUtils'
+import { listDrawingFolders } from './drawingPaths'
 /**
  * 社内データ検索・RAG機能モジュール
  * 既存システムから完全独立・読み取り専用
@@ -274,14 +275,12 @@ async function searchDrawings(keywords: ExtractedKeywords): Promise<DrawingMatch
     
     const matches: DrawingMatch[] = []
     
-    // ディレクトリ一覧取得
-    const drawingDirs = await fs.readdir(workInstructionsPath, { withFileTypes: true })
+    // 図番フォルダ一覧取得（シャード配置にも対応）
+    const drawingDirNames = await listDrawingFolders(dataRootPath)
     
-    for (const dir of drawingDirs) {
-      if (!dir.isDirectory()) continue
-      
+    for (const dirName of drawingDirNames) {
       try {
-        const instructionPath = path.join(workInstructionsPath, dir.name, 'instruction.json')
+        const instructionPath = path.join(workInstructionsPath, dirName, 'instruction.json')
         const instructionData = await fs.readFile(instructionPath, 'utf-8')
         const instruction = JSON.parse(instructionData)
         
@@ -339,7 +338,7 @@ async function searchDrawings(keywords: ExtractedKeywords): Promise<DrawingMatch
         
         if (relevanceScore > 0) {
           matches.push({
-            drawingNumber: metadata.drawingNumber || dir.name,
+            drawingNumber: metadata.drawingNumber || path.basename(dirName),
             title: title,
             companyId: metadata.companyId || 'unknown',
             machineTypes: machineTypeLabels,
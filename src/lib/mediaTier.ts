@@ -0,0 +1,103 @@
+// src/lib/mediaTier.ts - 二次ストレージへ移動した動画の解決
+//
+// scripts/media_tiering.py はアクセスのない動画を二次ストレージへ移動し、
+// <データルート>/media-tiers.json にデータルートからの相対パスで記録する。
+// 高速領域にファイルが無い場合はマニフェストを引いて二次ストレージのパスを返し、
+// 同時に高速領域へ書き戻す（マニフェストの更新は次回のスクリプト実行時に行う）。
+
+import path from 'path'
+import { promises as fs } from 'fs'
+
+const MANIFEST_NAME = 'media-tiers.json'
+
+interface MediaTierManifest {
+  version: number
+  coldRoot: string | null
+  files: Record<string, { size: number }>
+}
+
+let cached: { filePath: string; mtimeMs: number; manifest: MediaTierManifest } | null = null
+const promoting = new Set<string>()
+
+async function loadManifest(dataRootPath: string): Promise<MediaTierManifest | null> {
+  const filePath = path.join(dataRootPath, MANIFEST_NAME)
+
+  let mtimeMs: number
+  try {
+    mtimeMs = (await fs.stat(filePath)).mtimeMs
+  } catch {
+    return null
+  }
+
+  if (cached && cached.filePath === filePath && cached.mtimeMs === mtimeMs) {
+    return cached.manifest
+  }
+
+  const manifest = JSON.parse(await fs.readFile(filePath, 'utf-8')) as MediaTierManifest
+  cached = { filePath, mtimeMs, manifest }
+  return manifest
+}
+
+function toManifestKey(dataRootPath: string, filePath: string): string {
+  return path.relative(dataRootPath, filePath).split(path.sep).join('/')
+}
+
+async function promote(coldPath: string, hotPath: string): Promise<void> {
+  if (promoting.has(hotPath)) return
+  promoting.add(hotPath)
+
+  const tempPath = path.join(path.dirname(hotPath), `.${path.basename(hotPath)}.tmp`)
+  try {
+    await fs.mkdir(path.dirname(hotPath), { recursive: true })
+    await fs.copyFile(coldPath, tempPath)
+    await fs.rename(tempPath, hotPath)
+  } catch (error) {
+    console.error('[media-tier] Failed to promote media:', hotPath, error)
+    await fs.rm(tempPath, { force: true })
+  } finally {
+    promoting.delete(hotPath)
+  }
+}
+
+/**
+ * 配信するファイルの実際のパス
+ * 高速領域に無く、二次ストレージへ移動済みならそのパスを返し、書き戻しを開始する
+ */
+export async function resolveMediaFile(dataRootPath: string, filePath: string): Promise<string | null> {
+  try {
+    await fs.access(filePath)
+    return filePath
+  } catch {
+    // 高速領域に無ければマニフェストを見る
+  }
+
+  const manifest = await loadManifest(dataRootPath)
+  const key = toManifestKey(dataRootPath, filePath)
+  if (!manifest?.coldRoot || !manifest.files[key]) {
+    return null
+  }
+
+  const coldPath = path.join(manifest.coldRoot, ...key.split('/'))
+  try {
+    await fs.access(coldPath)
+  } catch {
+    return null
+  }
+
+  // 書き戻しは待たずに二次ストレージから配信する
+  void promote(coldPath, filePath)
+  return coldPath
+}
+
+/**
+ * フォルダ内で二次ストレージへ移動済みのファイル名
+ */
+export async function listColdFiles(dataRootPath: string, folderPath: string): Promise<string[]> {
+  const manifest = await loadManifest(dataRootPath)
+  if (!manifest) return []
+
+  const prefix = `${toManifestKey(dataRootPath, folderPath)}/`
+  return Object.keys(manifest.files)
+    .filter(key => key.startsWith(prefix) && !key.slice(prefix.length).includes('/'))
+    .map(key => key.slice(prefix.length))
+}
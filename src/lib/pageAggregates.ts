@@ -0,0 +1,268 @@
+// src/lib/pageAggregates.ts - トップ・カテゴリ・図番一覧ページの集計
+//
+// companies.json と search-index.json を1回ずつ走査し、各ページが表示する項目だけを
+// <データルート>/page-aggregates/ にページごとの小さな JSON として書き出す。
+// 元ファイルの更新時刻・サイズが state.json の記録と変わっていれば、次の読み込み時に作り直す。
+// 作り直しでは内容が変わったページのファイルだけを書き換えるので、変わっていない
+// ページの ETag はそのまま有効。
+// データルートに書き込めない場合（読み取り専用のマウント等）は、作り直した集計を
+// メモリに持ったまま応答する。
+
+import path from 'path'
+import crypto from 'crypto'
+import { promises as fs } from 'fs'
+import type {
+  Company,
+  DrawingSearchItem,
+  HomePageAggregate,
+  CategoryPageAggregate,
+  DrawingsPageAggregate
+} from './dataLoader'
+
+const OUTPUT_DIR = 'page-aggregates'
+const STATE_NAME = 'state.json'
+const STATE_VERSION = 1
+
+type FileSignature = { mtimeNs: string; size: number } | null
+
+interface AggregateState {
+  version: number
+  sources: { companies: FileSignature; searchIndex: FileSignature }
+  pages: Record<string, { file: string; etag: string }>
+}
+
+export interface PageAggregateArtifact {
+  body: Buffer
+  etag: string
+}
+
+interface LoadedAggregates {
+  state: AggregateState
+  // このプロセスで作り直した場合のページ内容（ページの識別子 → JSON）
+  bodies: Map<string, string> | null
+}
+
+let cached: ({ dataPath: string } & LoadedAggregates) | null = null
+let rebuilding: Promise<LoadedAggregates> | null = null
+
+/**
+ * ページの識別子（home / category/<会社ID> / drawings/<会社ID>/<カテゴリ>）
+ */
+export function pageKey(page: string, companyId?: string | null, category?: string | null): string | null {
+  if (page === 'home') return 'home'
+  if (page === 'category' && companyId) return `category/${companyId}`
+  if (page === 'drawings' && companyId && category) return `drawings/${companyId}/${category}`
+  return null
+}
+
+function pageFileName(page: string, companyId?: string, category?: string): string {
+  // 会社ID・カテゴリ名はファイル名に使えない文字や '..' を含みうるのでエンコードする
+  const encode = (value: string) => encodeURIComponent(value).replace(/\./g, '%2E')
+  if (page === 'home') return 'home.json'
+  if (page === 'category') return `category/${encode(companyId!)}.json`
+  return `drawings/${encode(companyId!)}/${encode(category!)}.json`
+}
+
+async function signature(filePath: string): Promise<FileSignature> {
+  try {
+    const stat = await fs.stat(filePath, { bigint: true })
+    return { mtimeNs: stat.mtimeNs.toString(), size: Number(stat.size) }
+  } catch {
+    return null
+  }
+}
+
+function sameSignature(a: FileSignature, b: FileSignature): boolean {
+  return a?.mtimeNs === b?.mtimeNs && a?.size === b?.size
+}
+
+async function readJson<T>(filePath: string, fallback: T): Promise<T> {
+  try {
+    return JSON.parse(await fs.readFile(filePath, 'utf-8')) as T
+  } catch {
+    return fallback
+  }
+}
+
+/**
+ * 一時ファイルに書いてから置き換える
+ * 一時ファイル名はプロセスごとに変え、複数のワーカーが同時に作り直しても衝突しないようにする
+ */
+async function writeFileAtomic(filePath: string, body: string): Promise<void> {
+  const tempPath = `${filePath}.${process.pid}.${crypto.randomBytes(4).toString('hex')}.tmp`
+  try {
+    await fs.mkdir(path.dirname(filePath), { recursive: true })
+    await fs.writeFile(tempPath, body, 'utf-8')
+    await fs.rename(tempPath, filePath)
+  } catch (error) {
+    await fs.rm(tempPath, { force: true }).catch(() => {})
+    throw error
+  }
+}
+
+/**
+ * 全ページの集計を計算する（ページの識別子 → [ファイル名, 内容]）
+ */
+function computeAggregates(companies: Company[], drawings: DrawingSearchItem[]): Map<string, [string, unknown]> {
+  const pages = new Map<string, [string, unknown]>()
+
+  // 検索インデックスの走査: 図番ごとの表示用図番
+  const displayNumbers = new Map<string, string | undefined>()
+  for (const drawing of drawings) {
+    displayNumbers.set(drawing.drawingNumber, drawing.displayDrawingNumber)
+  }
+
+  // companies.json の走査: 会社 → カテゴリ → 製品 → 図番
+  const home: HomePageAggregate = { companies: [] }
+  for (const company of companies) {
+    const categories = new Map<string, CategoryPageAggregate['categories'][number]>()
+    const drawingsPages = new Map<string, DrawingsPageAggregate>()
+
+    for (const product of company.products) {
+      let category = categories.get(product.category)
+      let drawingsPage = drawingsPages.get(product.category)
+      if (!category || !drawingsPage) {
+        category = { name: product.category, drawingCount: 0 }
+        drawingsPage = { company: { id: company.id, name: company.name }, category: product.category, products: [] }
+        categories.set(product.category, category)
+        drawingsPages.set(product.category, drawingsPage)
+      }
+
+      category.drawingCount += product.drawings.length
+      drawingsPage.products.push({
+        id: product.id,
+        name: product.name,
+        drawings: product.drawings.map(drawingNumber => ({
+          drawingNumber,
+          displayDrawingNumber: displayNumbers.get(drawingNumber)
+        }))
+      })
+    }
+
+    home.companies.push({ id: company.id, name: company.name, description: company.description })
+
+    pages.set(pageKey('category', company.id)!, [
+      pageFileName('category', company.id),
+      { company: { id: company.id, name: company.name }, categories: [...categories.values()] }
+    ])
+    for (const [name, drawingsPage] of drawingsPages) {
+      pages.set(pageKey('drawings', company.id, name)!, [pageFileName('drawings', company.id, name), drawingsPage])
+    }
+  }
+
+  pages.set('home', [pageFileName('home'), home])
+
+  return pages
+}
+
+async function rebuild(dataPath: string): Promise<LoadedAggregates> {
+  const companiesPath = path.join(dataPath, 'companies.json')
+  const searchIndexPath = path.join(dataPath, 'search-index.json')
+  const outputDir = path.join(dataPath, OUTPUT_DIR)
+
+  // 読み込み前に記録する（読み込み中に更新された場合は次回また作り直す）
+  const sources = { companies: await signature(companiesPath), searchIndex: await signature(searchIndexPath) }
+  const [companiesFile, searchIndexFile, previous] = await Promise.all([
+    readJson<{ companies?: Company[] }>(companiesPath, {}),
+    readJson<{ drawings?: DrawingSearchItem[] }>(searchIndexPath, {}),
+    readJson<AggregateState | null>(path.join(outputDir, STATE_NAME), null)
+  ])
+  const previousPages = previous?.version === STATE_VERSION ? previous.pages : {}
+
+  const state: AggregateState = { version: STATE_VERSION, sources, pages: {} }
+  const bodies = new Map<string, string>()
+
+  for (const [key, [file, data]] of computeAggregates(companiesFile.companies || [], searchIndexFile.drawings || [])) {
+    const body = JSON.stringify(data)
+    const etag = `"${crypto.createHash('sha256').update(body).digest('hex').slice(0, 32)}"`
+    state.pages[key] = { file, etag }
+    bodies.set(key, body)
+  }
+
+  try {
+    let written = 0
+    for (const [key, page] of Object.entries(state.pages)) {
+      const filePath = path.join(outputDir, page.file)
+      if (previousPages[key]?.etag === page.etag && previousPages[key].file === page.file) {
+        try {
+          await fs.access(filePath)
+          continue
+        } catch {
+          // ファイルが消えていれば書き直す
+        }
+      }
+      await writeFileAtomic(filePath, bodies.get(key)!)
+      written++
+    }
+
+    // 削除された会社・カテゴリのページを片付ける
+    const liveFiles = new Set(Object.values(state.pages).map(page => page.file))
+    for (const [key, page] of Object.entries(previousPages)) {
+      if (!state.pages[key] && !liveFiles.has(page.file)) {
+        await fs.rm(path.join(outputDir, page.file), { force: true })
+      }
+    }
+
+    await writeFileAtomic(path.join(outputDir, STATE_NAME), JSON.stringify(state))
+
+    if (written > 0) {
+      console.log(`📊 ページ集計を更新しました: ${written}/${Object.keys(state.pages).length}ページ`)
+    }
+  } catch (error) {
+    console.warn('ページ集計を書き込めませんでした（メモリ上の集計で応答します）:', error)
+  }
+
+  return { state, bodies }
+}
+
+async function getFreshAggregates(dataPath: string, forceRebuild = false): Promise<LoadedAggregates> {
+  if (!forceRebuild) {
+    let loaded: LoadedAggregates | null = cached?.dataPath === dataPath ? cached : null
+    if (!loaded) {
+      const state = await readJson<AggregateState | null>(path.join(dataPath, OUTPUT_DIR, STATE_NAME), null)
+      loaded = state ? { state, bodies: null } : null
+    }
+
+    if (loaded?.state.version === STATE_VERSION) {
+      const [companies, searchIndex] = await Promise.all([
+        signature(path.join(dataPath, 'companies.json')),
+        signature(path.join(dataPath, 'search-index.json'))
+      ])
+      if (sameSignature(companies, loaded.state.sources.companies) &&
+          sameSignature(searchIndex, loaded.state.sources.searchIndex)) {
+        cached = { dataPath, ...loaded }
+        return loaded
+      }
+    }
+  }
+
+  // 同時に来たリクエストで作り直しが重ならないようにする
+  rebuilding ??= rebuild(dataPath).finally(() => {
+    rebuilding = null
+  })
+  const loaded = await rebuilding
+  cached = { dataPath, ...loaded }
+  return loaded
+}
+
+/**
+ * ページの集計を返す。該当するページが無ければ null
+ */
+export async function getPageAggregate(dataPath: string, key: string): Promise<PageAggregateArtifact | null> {
+  const loaded = await getFreshAggregates(dataPath)
+  const page = loaded.state.pages[key]
+  if (!page) return null
+
+  if (!loaded.bodies) {
+    try {
+      return { body: await fs.readFile(path.join(dataPath, OUTPUT_DIR, page.file)), etag: page.etag }
+    } catch {
+      // ファイルが消えていれば作り直し、メモリ上の内容を返す
+    }
+  }
+
+  const { state, bodies } = loaded.bodies ? loaded : await getFreshAggregates(dataPath, true)
+  const body = bodies?.get(key)
+  if (!state.pages[key] || body === undefined) return null
+  return { body: Buffer.from(body, 'utf-8'), etag: state.pages[key].etag }
+}
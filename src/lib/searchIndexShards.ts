@@ -0,0 +1,149 @@
+// src/lib/searchIndexShards.ts - 会社別検索インデックスシャードの配信
+//
+// シャードは scripts/build_search_index_shards.py が <データルート>/search-index-shards/ に
+// 作成する（manifest.json と company-<会社ID>.json、それぞれの .gz / .br）。
+// search-index.json の更新時刻・サイズがマニフェストの記録と異なる場合は
+// シャードが古いとみなし、search-index.json から同じ内容をその場で作る。
+
+import path from 'path'
+import crypto from 'crypto'
+import { promises as fs } from 'fs'
+
+const OUTPUT_DIR = 'search-index-shards'
+const MANIFEST_NAME = 'manifest.json'
+const MANIFEST_VERSION = 1
+const UNASSIGNED_COMPANY = 'unknown'
+
+type Encoding = 'identity' | 'gzip' | 'br'
+
+const SUFFIXES: Record<Encoding, string> = { identity: '', gzip: '.gz', br: '.br' }
+
+interface ShardEntry {
+  file: string
+  etag: string
+  encodings: Encoding[]
+  companyName: string
+  drawingCount: number
+}
+
+interface ShardManifest {
+  version: number
+  source: { mtimeNs: string; size: number }
+  metadata: Record<string, unknown>
+  totalDrawings: number
+  encodings: Encoding[]
+  companies: Record<string, ShardEntry>
+}
+
+export interface SearchIndexArtifact {
+  body: Buffer
+  etag: string
+  encoding: Encoding
+}
+
+interface SearchIndexFile {
+  drawings?: Array<{ companyId?: string; companyName?: string; [key: string]: unknown }>
+  metadata?: Record<string, unknown>
+}
+
+function pickEncoding(available: Encoding[], acceptEncoding: string): Encoding {
+  const accepted = acceptEncoding.toLowerCase()
+  if (available.includes('br') && /\bbr\b/.test(accepted)) return 'br'
+  if (available.includes('gzip') && /\bgzip\b/.test(accepted)) return 'gzip'
+  return 'identity'
+}
+
+function toEtag(hash: string, encoding: Encoding): string {
+  // 表現（圧縮方式）ごとに異なる強い ETag にする
+  return encoding === 'identity' ? `"${hash}"` : `"${hash}-${encoding}"`
+}
+
+async function loadFreshManifest(dataPath: string): Promise<{ raw: Buffer; manifest: ShardManifest } | null> {
+  const manifestPath = path.join(dataPath, OUTPUT_DIR, MANIFEST_NAME)
+  try {
+    const [raw, sourceStat] = await Promise.all([
+      fs.readFile(manifestPath),
+      fs.stat(path.join(dataPath, 'search-index.json'), { bigint: true })
+    ])
+    const manifest = JSON.parse(raw.toString('utf-8')) as ShardManifest
+    if (
+      manifest.version !== MANIFEST_VERSION ||
+      manifest.source.mtimeNs !== sourceStat.mtimeNs.toString() ||
+      manifest.source.size !== Number(sourceStat.size)
+    ) {
+      return null
+    }
+    return { raw, manifest }
+  } catch {
+    return null
+  }
+}
+
+/**
+ * シャード未作成・古い場合に search-index.json から直接作る（圧縮は行わない）
+ */
+async function buildFromSource(dataPath: string, companyId: string | null): Promise<SearchIndexArtifact | null> {
+  const searchIndex = JSON.parse(
+    await fs.readFile(path.join(dataPath, 'search-index.json'), 'utf-8')
+  ) as SearchIndexFile
+  const drawings = searchIndex.drawings || []
+
+  let data: unknown
+  if (companyId === null) {
+    const companies: Record<string, { companyName: string; drawingCount: number }> = {}
+    for (const drawing of drawings) {
+      const id = drawing.companyId || UNASSIGNED_COMPANY
+      companies[id] ??= { companyName: drawing.companyName || '', drawingCount: 0 }
+      companies[id].drawingCount++
+    }
+    data = { metadata: searchIndex.metadata || {}, totalDrawings: drawings.length, companies }
+  } else {
+    const companyDrawings = drawings.filter(d => (d.companyId || UNASSIGNED_COMPANY) === companyId)
+    if (companyDrawings.length === 0) return null
+    data = { companyId, drawings: companyDrawings }
+  }
+
+  const body = Buffer.from(JSON.stringify(data), 'utf-8')
+  const hash = crypto.createHash('sha256').update(body).digest('hex').slice(0, 32)
+  return { body, etag: toEtag(hash, 'identity'), encoding: 'identity' }
+}
+
+/**
+ * マニフェスト（companyId が null）または会社別シャードを、
+ * Accept-Encoding に合った圧縮済みファイルで返す。該当する会社が無ければ null
+ */
+export async function getSearchIndexArtifact(
+  dataPath: string,
+  companyId: string | null,
+  acceptEncoding: string
+): Promise<SearchIndexArtifact | null> {
+  const fresh = await loadFreshManifest(dataPath)
+  if (!fresh) {
+    return buildFromSource(dataPath, companyId)
+  }
+
+  let fileName: string
+  let hash: string
+  let available: Encoding[]
+  if (companyId === null) {
+    fileName = MANIFEST_NAME
+    hash = crypto.createHash('sha256').update(fresh.raw).digest('hex').slice(0, 32)
+    available = fresh.manifest.encodings
+  } else {
+    const entry = fresh.manifest.companies[companyId]
+    if (!entry) return null
+    fileName = entry.file
+    hash = entry.etag
+    available = entry.encodings
+  }
+
+  const encoding = pickEncoding(available, acceptEncoding)
+  try {
+    const body = await fs.readFile(path.join(dataPath, OUTPUT_DIR, fileName + SUFFIXES[encoding]))
+    return { body, etag: toEtag(hash, encoding), encoding }
+  } catch {
+    // 圧縮版が欠けている場合は非圧縮版を返す
+    const body = await fs.readFile(path.join(dataPath, OUTPUT_DIR, fileName))
+    return { body, etag: toEtag(hash, 'identity'), encoding: 'identity' }
+  }
+}
@@ -0,0 +1,166 @@
+// src/lib/tfidfIndex.ts - チャット検索用 TF-IDF インデックスの読み込み・検索
+//
+// インデックスは scripts/build_tfidf_index.py が <データルート>/search-tfidf/ に作成する。
+// 語ごとの転置リスト（CSC 形式）を保持し、質問文との内積で図番をランキングする。
+
+import path from 'path'
+import { promises as fs } from 'fs'
+
+const INDEX_DIR = 'search-tfidf'
+
+interface TfidfDoc {
+  drawingNumber: string
+  folderPath: string
+  title: string
+}
+
+interface TfidfMeta {
+  version: number
+  createdAt: string
+  docs: TfidfDoc[]
+  vocabulary: Record<string, number>
+}
+
+interface TfidfIndex {
+  docs: TfidfDoc[]
+  vocabulary: Map<string, number>
+  idf: Float32Array
+  indptr: Int32Array
+  indices: Int32Array
+  data: Float32Array
+  // インデックスに含まれる図番フォルダ名（drawing-<図番>）
+  folderNames: Set<string>
+  loadedMtimeMs: number
+}
+
+export interface TfidfHit {
+  drawingNumber: string
+  folderPath: string
+  score: number
+}
+
+// build_tfidf_index.py の TOKEN_PATTERN と同じ規則
+const TOKEN_PATTERN = /[a-z0-9][a-z0-9_\-]*|[\u3040-\u30ff\u3400-\u9fff]+/g
+const ASCII_START = /^[a-z0-9]/
+// ひらがなだけの語は助詞・助動詞・活用語尾（です・ます・どう 等）なので索引に入れない
+const HIRAGANA_ONLY = /^[\u3040-\u309f]+$/
+
+const cache = new Map<string, TfidfIndex>()
+
+/**
+ * NFKC 正規化・小文字化した上で語と文字 bigram に分割（ひらがなだけの語は除く）
+ */
+export function tokenize(text: string): string[] {
+  const normalized = text.normalize('NFKC').toLowerCase()
+  const tokens: string[] = []
+  for (const run of normalized.match(TOKEN_PATTERN) || []) {
+    if (ASCII_START.test(run) || run.length === 1) {
+      tokens.push(run)
+    } else {
+      for (let i = 0; i < run.length - 1; i++) {
+        tokens.push(run.slice(i, i + 2))
+      }
+    }
+  }
+  return tokens.filter(token => !HIRAGANA_ONLY.test(token))
+}
+
+async function readTypedArray<T>(filePath: string, ArrayType: new (buffer: ArrayBuffer) => T): Promise<T> {
+  const buffer = await fs.readFile(filePath)
+  // Buffer はプール領域の途中を指すことがあるため、揃った ArrayBuffer にコピーする
+  const copy = buffer.buffer.slice(buffer.byteOffset, buffer.byteOffset + buffer.byteLength) as ArrayBuffer
+  return new ArrayType(copy)
+}
+
+/**
+ * インデックスを読み込む（meta.json が更新されるまでメモリにキャッシュ）
+ * インデックス未作成の場合は null を返す
+ */
+export async function loadTfidfIndex(dataRootPath: string): Promise<TfidfIndex | null> {
+  const indexDir = path.join(dataRootPath, INDEX_DIR)
+  const metaPath = path.join(indexDir, 'meta.json')
+
+  let mtimeMs: number
+  try {
+    mtimeMs = (await fs.stat(metaPath)).mtimeMs
+  } catch {
+    return null
+  }
+
+  const cached = cache.get(indexDir)
+  if (cached && cached.loadedMtimeMs === mtimeMs) {
+    return cached
+  }
+
+  const [metaContent, idf, indptr, indices, data] = await Promise.all([
+    fs.readFile(metaPath, 'utf-8'),
+    readTypedArray(path.join(indexDir, 'idf.f32'), Float32Array),
+    readTypedArray(path.join(indexDir, 'indptr.i32'), Int32Array),
+    readTypedArray(path.join(indexDir, 'indices.i32'), Int32Array),
+    readTypedArray(path.join(indexDir, 'data.f32'), Float32Array)
+  ])
+
+  const meta = JSON.parse(metaContent) as TfidfMeta
+  const index: TfidfIndex = {
+    docs: meta.docs,
+    vocabulary: new Map(Object.entries(meta.vocabulary)),
+    idf,
+    indptr,
+    indices,
+    data,
+    folderNames: new Set(meta.docs.map(doc => path.basename(doc.folderPath))),
+    loadedMtimeMs: mtimeMs
+  }
+  cache.set(indexDir, index)
+  return index
+}
+
+/**
+ * 質問文に対して TF-IDF コサイン類似度の高い順に図番を返す（topK 省略時は類似度が正の全件）
+ */
+export async function queryTfidfIndex(
+  dataRootPath: string,
+  query: string,
+  topK = Infinity
+): Promise<TfidfHit[] | null> {
+  const index = await loadTfidfIndex(dataRootPath)
+  if (!index) return null
+
+  const counts = new Map<number, number>()
+  for (const token of tokenize(query)) {
+    const column = index.vocabulary.get(token)
+    if (column !== undefined) {
+      counts.set(column, (counts.get(column) || 0) + 1)
+    }
+  }
+  if (counts.size === 0) return []
+
+  // 質問ベクトル（サブリニア TF × IDF、L2 正規化）
+  const weights: Array<[number, number]> = []
+  let norm = 0
+  for (const [column, count] of counts) {
+    const weight = (1 + Math.log(count)) * index.idf[column]
+    weights.push([column, weight])
+    norm += weight * weight
+  }
+  norm = Math.sqrt(norm)
+
+  // 転置リストをたどって内積を累積
+  const scores = new Float32Array(index.docs.length)
+  for (const [column, weight] of weights) {
+    const normalizedWeight = weight / norm
+    for (let p = index.indptr[column]; p < index.indptr[column + 1]; p++) {
+      scores[index.indices[p]] += index.data[p] * normalizedWeight
+    }
+  }
+
+  const hits: TfidfHit[] = []
+  scores.forEach((score, row) => {
+    if (score > 0) {
+      const doc = index.docs[row]
+      hits.push({ drawingNumber: doc.drawingNumber, folderPath: doc.folderPath, score })
+    }
+  })
+
+  return hits.sort((a, b) => b.score - a.score).slice(0, topK)
+}